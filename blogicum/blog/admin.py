@@ -1,36 +1,138 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth.models import Group
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
 
-from blog.models import Category, Comment, Location, Post
+from blog.constants import ADMIN_INLINE_MAX_ROWS
+from blog.models import Category, Comment, ImageJob, Location, Post
+from blog.paginators import EstimatedCountPaginator
+from blog.search import search_posts
+from blog.utils import bulk_update_posts
 
 admin.site.unregister(Group)
 admin.site.empty_value_display = 'Не задано'
 
 
-class PostInline(admin.StackedInline):
-    model = Post
+class RecentInlineFormSet(BaseInlineFormSet):
+    """
+    Формсет встроенной формы, который показывает только последние
+    ADMIN_INLINE_MAX_ROWS связанных объектов (порядок задаёт ordering
+    встроенной формы). Остальные доступны по ссылке changelist_url
+    на отфильтрованный список объектов.
+    """
+
+    def get_max_rows(self):
+        return getattr(
+            settings, 'ADMIN_INLINE_MAX_ROWS', ADMIN_INLINE_MAX_ROWS
+        )
+
+    def get_queryset(self):
+        if not hasattr(self, '_recent_queryset'):
+            self._recent_queryset = super().get_queryset()[
+                :self.get_max_rows()
+            ]
+        return self._recent_queryset
+
+    @cached_property
+    def total_count(self):
+        if self.instance.pk is None:
+            return 0
+        return super().get_queryset().count()
+
+    @property
+    def changelist_url(self):
+        opts = self.model._meta
+        url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        return f'{url}?' + urlencode({
+            f'{self.fk.name}__{self.fk.target_field.name}__exact':
+                self.instance.pk
+        })
+
+
+class RecentStackedInline(admin.StackedInline):
+    formset = RecentInlineFormSet
+    template = 'admin/blog/edit_inline/recent_stacked.html'
     extra = 0
 
 
-class CommentInline(admin.StackedInline):
+class PostInline(RecentStackedInline):
+    model = Post
+    ordering = ('-pub_date',)
+    autocomplete_fields = ('author', 'location', 'category')
+
+
+class CommentInline(RecentStackedInline):
     model = Comment
-    extra = 0
+    ordering = ('-created_at',)
+    autocomplete_fields = ('author',)
+
+
+class AuthorFilter(admin.SimpleListFilter):
+    """
+    Фильтр по автору с полем ввода имени пользователя:
+    в отличие от стандартного фильтра по связи не загружает
+    для боковой панели всех пользователей.
+    """
+
+    title = 'автору'
+    parameter_name = 'author'
+    template = 'admin/blog/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(author__username=self.value())
+        return queryset
+
+    def choices(self, changelist):
+        # Форма фильтра сохраняет остальные параметры списка
+        yield {
+            'value': self.value() or '',
+            'query_parts': [
+                (key, value) for key, value in changelist.params.items()
+                if key != self.parameter_name
+            ],
+            'clear_url': changelist.get_query_string(
+                remove=[self.parameter_name]
+            ),
+        }
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(),
+        required=False,
+        label='Категория'
+    )
 
 
 class CategoryAdmin(admin.ModelAdmin):
     inlines = (
         PostInline,
     )
+    search_fields = ('title',)
 
 
 class LocationAdmin(admin.ModelAdmin):
     inlines = (
         PostInline,
     )
+    search_fields = ('name',)
 
 
 class CommentAdmin(admin.ModelAdmin):
     empty_value_display = 'Не задано'
+    autocomplete_fields = ('post', 'author')
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -53,16 +155,85 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'category'
     )
+    # Виджеты с поиском вместо выпадающих списков всех объектов
+    # в каждой строке списка и на странице публикации
+    autocomplete_fields = ('author', 'location', 'category')
+    list_select_related = ('author', 'location', 'category')
     search_fields = ('title',)
     list_filter = ('is_published',
-                   'author',
+                   AuthorFilter,
                    'location',
                    'category'
                    )
     list_display_links = ('title',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = (
+        'publish_posts',
+        'unpublish_posts',
+        'move_to_category',
+        'clear_location',
+    )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по заголовку и тексту через полнотекстовый индекс"""
+        if not search_term.strip():
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    @admin.action(description='Опубликовать выбранные публикации')
+    def publish_posts(self, request, queryset):
+        updated = bulk_update_posts(queryset, is_published=True)
+        self.message_user(request, f'Опубликовано публикаций: {updated}')
+
+    @admin.action(description='Снять выбранные публикации с публикации')
+    def unpublish_posts(self, request, queryset):
+        updated = bulk_update_posts(queryset, is_published=False)
+        self.message_user(
+            request, f'Снято с публикации публикаций: {updated}'
+        )
+
+    @admin.action(description='Перенести выбранные публикации в категорию')
+    def move_to_category(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        category = form.cleaned_data['category'] if form.is_valid() else None
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса', messages.ERROR
+            )
+            return
+        updated = bulk_update_posts(queryset, category=category)
+        self.message_user(
+            request,
+            f'Перенесено в категорию «{category}» публикаций: {updated}'
+        )
+
+    @admin.action(description='Убрать местоположение у выбранных публикаций')
+    def clear_location(self, request, queryset):
+        updated = bulk_update_posts(queryset, location=None)
+        self.message_user(
+            request, f'Местоположение убрано у публикаций: {updated}'
+        )
+
+
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image',
+        'post',
+        'status',
+        'attempts',
+        'run_after',
+        'created_at',
+        'updated_at',
+    )
+    list_filter = ('status',)
+    readonly_fields = ('post', 'image', 'attempts', 'error')
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ImageJob, ImageJobAdmin)
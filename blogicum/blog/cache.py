@@ -0,0 +1,144 @@
+from hashlib import md5
+from time import monotonic, time_ns
+
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+
+from blog.constants import CATEGORY_CACHE_SIZE, CATEGORY_CACHE_TIMEOUT
+from blog.models import Category
+
+FEED_COUNT_KEY = 'blog:feed_count:{}'
+PAGE_KEY = 'blog:page:{}:{}:{}'
+PAGE_VERSION_KEY = 'blog:page_version:{}'
+CARD_VERSION_KEY = 'blog:card_version:{}'
+INDEX_SCOPE = 'index'
+# Общая область всех лент: её версия меняется при изменениях,
+# которые видны в карточках любой ленты (категории, местоположения)
+ALL_SCOPE = 'all'
+
+# Кэш опубликованных категорий процесса: slug -> (категория, срок годности).
+# Сигналы сбрасывают его в текущем процессе, а срок годности ограничивает
+# устаревание в остальных процессах.
+_categories = {}
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def profile_scope(author_id):
+    return f'profile:{author_id}'
+
+
+def feed_count_key(scope):
+    return FEED_COUNT_KEY.format(scope)
+
+
+def post_feed_scopes(category_ids=(), author_ids=()):
+    """Ленты, в которых может показываться пост с такими связями"""
+    return {INDEX_SCOPE}.union(
+        category_scope(category_id)
+        for category_id in category_ids if category_id is not None
+    ).union(
+        profile_scope(author_id) for author_id in author_ids
+    )
+
+
+def invalidate_post_pages(rows):
+    """
+    Сбрасывает карточки постов и страницы лент, в которых они
+    показываются: rows — (pk, category_id, author_id) постов.
+    """
+    if not rows:
+        return
+    post_ids, category_ids, author_ids = zip(*rows)
+    invalidate_cards(post_ids)
+    invalidate_pages(post_feed_scopes(
+        category_ids=set(category_ids), author_ids=set(author_ids)
+    ))
+
+
+def invalidate_feed_counts(scopes):
+    cache.delete_many([feed_count_key(scope) for scope in scopes])
+
+
+def get_versions(keys):
+    """
+    Текущие значения счётчиков версий keys. Отсутствующий счётчик
+    (ещё не создан или вытеснен из кэша) заводится с уникальным
+    значением time_ns(), поэтому не возвращается к прежнему номеру,
+    под которым в кэше могут оставаться устаревшие записи.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time_ns(), None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time_ns(), None)
+
+
+def page_cache_key(scope, path):
+    """
+    Ключ кэша страницы ленты. В него входят версии области ленты
+    и общей области, поэтому сброс версии делает недоступными
+    все страницы области сразу, а старые записи истекают сами.
+    """
+    version_keys = [PAGE_VERSION_KEY.format(ALL_SCOPE),
+                    PAGE_VERSION_KEY.format(scope)]
+    versions = get_versions(version_keys)
+    version = '.'.join(str(versions[key]) for key in version_keys)
+    return PAGE_KEY.format(scope, version, md5(path.encode()).hexdigest())
+
+
+def invalidate_pages(scopes):
+    for scope in scopes:
+        bump_version(PAGE_VERSION_KEY.format(scope))
+
+
+def attach_card_versions(posts):
+    """
+    Проставляет постам версию карточки post.card_version для кэша
+    фрагментов includes/post_card.html одним обращением к кэшу.
+    Версия меняется при изменении поста, имени его автора
+    или количества комментариев к нему, а также вместе с общей
+    областью лент (категории, местоположения).
+    """
+    all_key = PAGE_VERSION_KEY.format(ALL_SCOPE)
+    keys = {post.pk: CARD_VERSION_KEY.format(post.pk) for post in posts}
+    versions = get_versions([all_key, *keys.values()])
+    for post in posts:
+        post.card_version = f'{versions[all_key]}.{versions[keys[post.pk]]}'
+    return posts
+
+
+def invalidate_cards(post_ids):
+    for post_id in post_ids:
+        bump_version(CARD_VERSION_KEY.format(post_id))
+
+
+def get_published_category(slug):
+    """Опубликованная категория по slug или 404"""
+    category, expires = _categories.get(slug, (None, 0))
+    if category is None or expires < monotonic():
+        category = get_object_or_404(Category, slug=slug, is_published=True)
+        if len(_categories) >= CATEGORY_CACHE_SIZE:
+            _categories.pop(next(iter(_categories)), None)
+        _categories[slug] = (category, monotonic() + CATEGORY_CACHE_TIMEOUT)
+    return category
+
+
+def forget_category(category_id):
+    for slug, (category, expires) in list(_categories.items()):
+        if category.pk == category_id:
+            _categories.pop(slug, None)
+
+
+def clear_category_cache():
+    _categories.clear()
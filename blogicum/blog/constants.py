@@ -4,3 +4,26 @@ LENGTH_OF_LOCATION_NAME = 64  # Макс. длина имени местопол
 LENGTH_OF_POST_TITLE = 128  # Макс. длина заголовка публикации в админ-зоне
 LENGTH_OF_COMMENT_TEXT = 128  # Макс. длина заголовка комментария в админ-зоне
 PAGINATOR = 10  # Макс. количество постов на странице
+PUB_DATE_GRANULARITY = 1  # Шаг округления времени отсечки постов, в секундах
+KEYSET_PAGINATION = False  # Курсорная пагинация лент вместо постраничной
+FEED_COUNT_TIMEOUT = 300  # Время жизни кэша количества постов ленты, секунд
+FEED_COUNT_ESTIMATE_THRESHOLD = None  # С какого размера ленты брать оценку
+CATEGORY_CACHE_SIZE = 256  # Макс. количество категорий в кэше процесса
+CATEGORY_CACHE_TIMEOUT = 60  # Время жизни категории в кэше процесса, секунд
+PAGE_CACHE_TIMEOUT = 60  # Время жизни кэша страниц лент для гостей, секунд
+CARD_CACHE_TIMEOUT = 60  # Время жизни кэша карточки поста, секунд
+POST_IMAGE_VARIANTS = {  # Ширина уменьшенных копий фото публикации
+    'feed': 640,
+    'detail': 1280,
+}
+POST_IMAGE_QUALITY = 85  # Качество JPEG и WebP уменьшенных копий
+IMAGE_JOB_MAX_ATTEMPTS = 3  # Сколько раз пробовать обработать фото
+IMAGE_JOB_POLL_INTERVAL = 2  # Пауза обработчика заданий без работы, секунд
+IMAGE_JOB_STALE_AFTER = 10 * 60  # Когда считать зависшим задание в работе
+IMAGE_JOB_RETRY_DELAY = 60  # Пауза перед повтором, удваивается с попыткой
+POST_IMAGE_ORIGINAL_QUALITY = 95  # Качество JPEG оригинала после очистки EXIF
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024  # Макс. размер загружаемого фото
+POST_IMAGE_MAX_PIXELS = 40_000_000  # Макс. количество пикселей фото
+COMMENTS_PER_PAGE = 20  # Количество комментариев на одной странице поста
+ADMIN_COUNT_ESTIMATE_THRESHOLD = 10_000  # С какого размера считать оценкой
+ADMIN_INLINE_MAX_ROWS = 10  # Сколько последних связанных объектов в форме
@@ -1,7 +1,48 @@
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
 from django.utils import timezone
+from PIL import Image
 
+from blog.constants import POST_IMAGE_MAX_PIXELS
 from blog.models import Comment, Post, User
+from blog.uploads import get_upload_max_bytes
+
+
+class BoundedImageField(forms.ImageField):
+    """
+    Поле фото с ограничением размера файла и количества пикселей.
+    Размер изображения читается из заголовка файла,
+    без декодирования всего изображения.
+    """
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return super().to_python(data)
+        max_bytes = get_upload_max_bytes()
+        if getattr(data, 'rejected', False) or data.size > max_bytes:
+            raise ValidationError(
+                'Размер фото не должен превышать %(max)s.',
+                code='file_too_large',
+                params={'max': filesizeformat(max_bytes)},
+            )
+        max_pixels = getattr(
+            settings, 'POST_IMAGE_MAX_PIXELS', POST_IMAGE_MAX_PIXELS
+        )
+        try:
+            width, height = Image.open(data).size
+        except Exception:
+            width = height = 0
+        finally:
+            data.seek(0)
+        if width * height > max_pixels:
+            raise ValidationError(
+                'Фото не должно содержать больше %(max)s пикселей.',
+                code='too_many_pixels',
+                params={'max': max_pixels},
+            )
+        return super().to_python(data)
 
 
 class PostForm(forms.ModelForm):
@@ -13,6 +54,9 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {
+            'image': BoundedImageField,
+        }
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'},
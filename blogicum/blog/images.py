@@ -0,0 +1,114 @@
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from blog.constants import (POST_IMAGE_ORIGINAL_QUALITY, POST_IMAGE_QUALITY,
+                            POST_IMAGE_VARIANTS)
+
+WEBP = 'webp'
+
+
+def get_image_variants():
+    return getattr(settings, 'POST_IMAGE_VARIANTS', POST_IMAGE_VARIANTS)
+
+
+def image_variant_names(name):
+    """
+    Имена уменьшенных копий фото рядом с оригиналом:
+    posts_images/photo.jpg -> posts_images/photo_feed.jpg,
+    posts_images/photo_feed.webp и т.д. PNG остаётся PNG
+    (может быть прозрачность), остальные форматы сохраняются в JPEG.
+    """
+    root, ext = posixpath.splitext(name)
+    ext = 'png' if ext.lower() == '.png' else 'jpg'
+    names = {}
+    for variant in get_image_variants():
+        names[variant] = f'{root}_{variant}.{ext}'
+        names[f'{variant}_{WEBP}'] = f'{root}_{variant}.{WEBP}'
+    return names
+
+
+def encode_image(image, image_format, quality=POST_IMAGE_QUALITY):
+    buffer = BytesIO()
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(buffer, image_format, quality=quality)
+    return ContentFile(buffer.getvalue())
+
+
+def save_image(storage, name, image, image_format,
+               quality=POST_IMAGE_QUALITY):
+    """Сохраняет изображение под точным именем name, перезаписывая файл"""
+    content = encode_image(image, image_format, quality)
+    if hasattr(storage, 'save_derivative'):
+        return storage.save_derivative(name, content)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def build_image_variants(name, storage=default_storage):
+    """Создаёт уменьшенные копии фото name с помощью Pillow"""
+    with storage.open(name) as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    names = image_variant_names(name)
+    for variant, width in get_image_variants().items():
+        resized = image.copy()
+        resized.thumbnail((width, width * 4))
+        fallback = names[variant]
+        save_image(
+            storage, fallback, resized,
+            'PNG' if fallback.endswith('.png') else 'JPEG'
+        )
+        save_image(storage, names[f'{variant}_{WEBP}'], resized, 'WEBP')
+    return names
+
+
+def strip_image_metadata(name, storage=default_storage):
+    """
+    Удаляет EXIF (в том числе геометки) из оригинала фото,
+    предварительно повернув изображение согласно EXIF-ориентации.
+    Возвращает имя очищенного файла: обычное хранилище перезаписывает
+    файл под тем же именем, а хранилище с именами по содержимому
+    сохраняет новый файл рядом, не трогая прежний.
+    """
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image_format = image.format
+        if not image.getexif():
+            return name
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    image.info.pop('exif', None)
+    if getattr(storage, 'content_addressed', False):
+        return storage.save(name, encode_image(
+            image, image_format, POST_IMAGE_ORIGINAL_QUALITY
+        ))
+    return save_image(
+        storage, name, image, image_format,
+        quality=POST_IMAGE_ORIGINAL_QUALITY
+    )
+
+
+def process_post_image(name, storage=default_storage):
+    """
+    Полная обработка загруженного фото: проверка файла,
+    удаление EXIF и создание уменьшенных копий.
+    Возвращает имя обработанного оригинала.
+    """
+    with storage.open(name) as source:
+        Image.open(source).verify()
+    name = strip_image_metadata(name, storage)
+    build_image_variants(name, storage)
+    return name
+
+
+def delete_image_variants(name, storage=default_storage):
+    for variant_name in image_variant_names(name).values():
+        if storage.exists(variant_name):
+            storage.delete(variant_name)
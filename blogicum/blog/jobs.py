@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from blog.cache import invalidate_post_pages
+from blog.constants import (IMAGE_JOB_MAX_ATTEMPTS, IMAGE_JOB_RETRY_DELAY,
+                            IMAGE_JOB_STALE_AFTER)
+from blog.images import process_post_image
+from blog.media import get_image_storage, release_image
+from blog.models import ImageJob, Post
+
+
+def enqueue_image_job(post):
+    """Ставит фото публикации в очередь фоновой обработки"""
+    return ImageJob.objects.create(post=post, image=post.image.name)
+
+
+def requeue_stale_jobs():
+    """Возвращает в очередь задания, зависшие в работе (упал обработчик)"""
+    return ImageJob.objects.filter(
+        status=ImageJob.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(
+            seconds=getattr(
+                settings, 'IMAGE_JOB_STALE_AFTER', IMAGE_JOB_STALE_AFTER
+            )
+        ),
+    ).update(status=ImageJob.PENDING, updated_at=timezone.now())
+
+
+def claim_next_job():
+    """
+    Забирает самое старое задание из очереди, срок повтора которого
+    уже наступил. Задание захватывается условным UPDATE по статусу, поэтому
+    несколько обработчиков не возьмут одно задание дважды
+    и на SQLite, и на PostgreSQL.
+    """
+    while True:
+        job = ImageJob.objects.filter(
+            status=ImageJob.PENDING, run_after__lte=timezone.now()
+        ).first()
+        if job is None:
+            return None
+        claimed = ImageJob.objects.filter(
+            pk=job.pk, status=ImageJob.PENDING
+        ).update(
+            status=ImageJob.RUNNING,
+            attempts=F('attempts') + 1,
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job, storage=None):
+    """
+    Обрабатывает фото задания и отмечает копии готовыми, если фото
+    публикации не сменилось, пока задание ждало в очереди.
+    Обработанный файл получают все публикации с тем же фото,
+    прежний файл освобождается.
+    При ошибке задание возвращается в очередь до исчерпания попыток
+    с паузой IMAGE_JOB_RETRY_DELAY, которая удваивается с каждой попыткой,
+    чтобы временные сбои успели пройти.
+    """
+    storage = storage or get_image_storage()
+    try:
+        if not Post.objects.filter(pk=job.post_id, image=job.image).exists():
+            job.status = ImageJob.DONE
+            job.save(update_fields=('status', 'updated_at'))
+            return job
+        name = process_post_image(job.image, storage)
+    except Exception as error:
+        max_attempts = getattr(
+            settings, 'IMAGE_JOB_MAX_ATTEMPTS', IMAGE_JOB_MAX_ATTEMPTS
+        )
+        retry_delay = getattr(
+            settings, 'IMAGE_JOB_RETRY_DELAY', IMAGE_JOB_RETRY_DELAY
+        )
+        job.error = f'{type(error).__name__}: {error}'
+        job.status = (
+            ImageJob.FAILED if job.attempts >= max_attempts
+            else ImageJob.PENDING
+        )
+        job.run_after = timezone.now() + timedelta(
+            seconds=retry_delay * 2 ** (job.attempts - 1)
+        )
+        job.save(update_fields=('status', 'error', 'run_after', 'updated_at'))
+        return job
+    posts = Post.objects.filter(image=job.image)
+    rows = list(posts.values_list('pk', 'category_id', 'author_id'))
+    posts.update(
+        image=name, image_variants_ready=True, updated_at=timezone.now()
+    )
+    if name != job.image:
+        release_image(job.image, storage)
+    invalidate_post_pages(rows)
+    job.status = ImageJob.DONE
+    job.error = ''
+    job.save(update_fields=('status', 'error', 'updated_at'))
+    return job
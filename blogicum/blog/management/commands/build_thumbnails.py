@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import invalidate_post_pages
+from blog.images import build_image_variants
+from blog.media import get_image_storage
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фото существующих публикаций'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество параллельных потоков обработки'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и для уже обработанных фото'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['force']:
+            posts = posts.filter(image_variants_ready=False)
+        names = set(posts.values_list('image', flat=True))
+        storage = get_image_storage()
+        built = failed = 0
+        # Pillow отпускает GIL при декодировании и сжатии,
+        # а запросы к базе выполняются только в основном потоке.
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(build_image_variants, name, storage):
+                name for name in names
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                    continue
+                rows = list(
+                    Post.objects.filter(image=name).values_list(
+                        'pk', 'category_id', 'author_id'
+                    )
+                )
+                Post.objects.filter(
+                    pk__in=[row[0] for row in rows]
+                ).update(
+                    image_variants_ready=True, updated_at=timezone.now()
+                )
+                invalidate_post_pages(rows)
+                built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {built}, с ошибками: {failed}'
+        ))
@@ -0,0 +1,90 @@
+import os
+import posixpath
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import invalidate_post_pages
+from blog.images import image_variant_names
+from blog.jobs import enqueue_image_job
+from blog.media import get_image_storage, release_image
+from blog.models import ImageJob, Post
+
+
+class Command(BaseCommand):
+    help = ('Переименовывает фото публикаций по хэшу содержимого, '
+            'объединяет одинаковые файлы и удаляет файлы без ссылок')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет сделано'
+        )
+
+    def handle(self, *args, **options):
+        storage = get_image_storage()
+        dry_run = options['dry_run']
+        merged = 0
+        names = Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).distinct().order_by()
+        for name in list(names):
+            if not storage.exists(name):
+                self.stderr.write(f'Нет файла: {name}')
+                continue
+            with storage.open(name) as content:
+                hashed = storage.hashed_name(name, content)
+                if hashed == name:
+                    continue
+                self.stdout.write(f'{name} -> {hashed}')
+                if dry_run:
+                    continue
+                hashed = storage.save(name, content)
+            posts = Post.objects.filter(image=name)
+            rows = list(posts.values_list('pk', 'category_id', 'author_id'))
+            posts.update(
+                image=hashed, image_variants_ready=False,
+                updated_at=timezone.now()
+            )
+            invalidate_post_pages(rows)
+            release_image(name, storage)
+            enqueue_image_job(Post.objects.filter(image=hashed).first())
+            merged += 1
+        removed = self.remove_orphans(storage, dry_run)
+        self.stdout.write(self.style.SUCCESS(
+            f'Переименовано фото: {merged}, удалено файлов без ссылок: '
+            f'{removed}'
+        ))
+
+    def remove_orphans(self, storage, dry_run):
+        """Удаляет файлы каталога фото, на которые нет ссылок"""
+        upload_to = Post._meta.get_field('image').upload_to
+        if not storage.exists(upload_to):
+            return 0
+        keep = set()
+        for name in Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).iterator():
+            keep.add(name)
+            keep.update(image_variant_names(name).values())
+        keep.update(
+            ImageJob.objects.exclude(status=ImageJob.DONE).values_list(
+                'image', flat=True
+            )
+        )
+        removed = 0
+        for root, dirs, files in os.walk(storage.path(upload_to)):
+            for filename in files:
+                name = posixpath.join(
+                    upload_to,
+                    os.path.relpath(
+                        os.path.join(root, filename), storage.path(upload_to)
+                    ).replace(os.sep, '/'),
+                )
+                if name in keep:
+                    continue
+                self.stdout.write(f'Без ссылок: {name}')
+                if not dry_run:
+                    storage.delete(name)
+                removed += 1
+        return removed
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from blog.transfer import dump_record, export_records
+
+PROGRESS_EVERY = 10_000
+
+
+class Command(BaseCommand):
+    help = ('Выгружает пользователей, категории, местоположения, '
+            'публикации и комментарии в файл JSON Lines (вместе '
+            'с хэшами паролей пользователей)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки; по умолчанию — стандартный вывод'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать из базы за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        to_stdout = path == '-'
+        output = sys.stdout if to_stdout else open(path, 'w', encoding='utf-8')
+        # При выгрузке в стандартный вывод ход работы пишется в stderr
+        progress = self.stderr if to_stdout else self.stdout
+        counts = {}
+        try:
+            for label, row in export_records(options['chunk_size']):
+                output.write(dump_record(label, row) + '\n')
+                counts[label] = counts.get(label, 0) + 1
+                if counts[label] % PROGRESS_EVERY == 0:
+                    progress.write(f'{label}: {counts[label]}')
+        finally:
+            if not to_stdout:
+                output.close()
+        for label, count in counts.items():
+            progress.write(self.style.SUCCESS(
+                f'Выгружено {label}: {count}'
+            ))
@@ -0,0 +1,56 @@
+import sys
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.cache import clear_category_cache
+from blog.transfer import batches, import_batch, read_records, reset_sequences
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_blog в формате JSON Lines '
+            'порциями. Поддерживается загрузка в пустую базу или в базу, '
+            'из которой сделана выгрузка: уже загруженные объекты '
+            'пропускаются, а если под тем же ключом в базе другой '
+            'объект, загрузка останавливается с ошибкой')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки; по умолчанию — стандартный ввод'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько записей создавать одним запросом'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        source = (
+            sys.stdin if path == '-' else open(path, encoding='utf-8')
+        )
+        read, created = {}, {}
+        try:
+            records = read_records(source)
+            for label, batch in batches(records, options['chunk_size']):
+                read[label] = read.get(label, 0) + len(batch)
+                created[label] = (
+                    created.get(label, 0) + import_batch(label, batch)
+                )
+                self.stdout.write(
+                    f'{label}: прочитано {read[label]}, '
+                    f'создано {created[label]}'
+                )
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        reset_sequences()
+        # bulk_create не вызывает сигналы, сбрасывающие кэш
+        cache.clear()
+        clear_category_cache()
+        for label, count in created.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'Создано {label}: {count} из {read[label]}'
+            ))
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.constants import IMAGE_JOB_POLL_INTERVAL
+from blog.jobs import claim_next_job, requeue_stale_jobs, run_job
+from blog.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = 'Фоновая обработка фото публикаций из очереди заданий'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать текущую очередь и завершиться'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=getattr(
+                settings, 'IMAGE_JOB_POLL_INTERVAL', IMAGE_JOB_POLL_INTERVAL
+            ),
+            help='Пауза между проверками пустой очереди, секунд'
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'Возвращено в очередь заданий: {requeued}')
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            run_job(job)
+            if job.status == ImageJob.DONE:
+                self.stdout.write(f'Обработано: {job.image}')
+            else:
+                self.stderr.write(f'{job.image}: {job.error}')
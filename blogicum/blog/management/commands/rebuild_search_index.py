@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс публикаций'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько публикаций читать из базы за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {indexed}'
+        ))
@@ -0,0 +1,38 @@
+from django.db import transaction
+
+from blog.images import delete_image_variants
+from blog.models import Post
+
+
+def get_image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def is_image_referenced(name):
+    """Ссылается ли на файл фото name хотя бы одна публикация"""
+    return Post.objects.filter(image=name).exists()
+
+
+def release_image(name, storage=None):
+    """
+    Удаляет файл фото и его уменьшенные копии,
+    если на него больше не ссылается ни одна публикация.
+    Ссылки проверяются ещё раз непосредственно перед удалением
+    оригинала: одновременная загрузка того же фото могла получить
+    это имя, пока удалялись копии.
+    """
+    if not name or is_image_referenced(name):
+        return False
+    storage = storage or get_image_storage()
+    delete_image_variants(name, storage)
+    if is_image_referenced(name):
+        return False
+    if storage.exists(name):
+        storage.delete(name)
+    return True
+
+
+def release_image_on_commit(name):
+    """Освобождает фото после фиксации транзакции, удалившей ссылку"""
+    if name:
+        transaction.on_commit(lambda: release_image(name))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Уменьшенные копии фото готовы'),
+        ),
+    ]
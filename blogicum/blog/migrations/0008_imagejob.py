@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_image_variants_ready'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.CharField(max_length=256, verbose_name='Фото')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменено')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_jobs', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'обработка фото',
+                'verbose_name_plural': 'Обработка фото',
+                'ordering': ('created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='imagejob',
+            index=models.Index(fields=['status', 'created_at'], name='imagejob_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Выполнить не раньше'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_imagejob_run_after'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchEntry',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('document', models.TextField(db_column='blog_post_fts', verbose_name='Документ')),
+            ],
+            options={
+                'verbose_name': 'поисковый индекс публикации',
+                'verbose_name_plural': 'Поисковый индекс публикаций',
+                'db_table': 'blog_post_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:24
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_search_entry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=blog.storage.ContentHashStorage(), upload_to='posts_images', verbose_name='Фото'),
+        ),
+    ]
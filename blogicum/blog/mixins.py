@@ -1,8 +1,18 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import patch_vary_headers
 
+from blog.cache import attach_card_versions, feed_count_key, page_cache_key
+from blog.constants import (CARD_CACHE_TIMEOUT, COMMENTS_PER_PAGE,
+                            FEED_COUNT_ESTIMATE_THRESHOLD, FEED_COUNT_TIMEOUT,
+                            KEYSET_PAGINATION, PAGE_CACHE_TIMEOUT, PAGINATOR)
 from blog.forms import CommentForm, PostForm
 from blog.models import Comment, Post
+from blog.paginators import CachedCountPaginator, KeysetPaginator
 
 
 class PostMixin:
@@ -12,6 +22,101 @@ class PostMixin:
     pk_url_kwarg = 'post_id'
 
 
+class PostFeedMixin:
+    """
+    Общие настройки лент публикаций.
+    related_fields и prefetch_fields перечисляют связи, которые
+    действительно нужны шаблону includes/post_card.html:
+    по ним строится queryset ленты.
+    keyset_pagination включает курсорную пагинацию по (pub_date, id);
+    None — взять значение настройки KEYSET_PAGINATION.
+    Количество постов для постраничной пагинации кэшируется
+    по ключу ленты из get_feed_scope().
+    Если cache_anonymous_pages включён, страницы для гостей целиком
+    кэшируются по адресу запроса в области ленты get_feed_scope().
+    Карточки постов кэшируются шаблоном по post.card_version
+    и общие для всех лент.
+    """
+
+    model = Post
+    paginate_by = PAGINATOR
+    paginator_class = CachedCountPaginator
+    related_fields = ('location', 'category', 'author')
+    prefetch_fields = ()
+    keyset_pagination = None
+    cache_anonymous_pages = True
+
+    def get(self, request, *args, **kwargs):
+        if not self.cache_anonymous_pages or request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = page_cache_key(self.get_feed_scope(), request.get_full_path())
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().get(request, *args, **kwargs)
+        patch_vary_headers(response, ('Cookie',))
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(key, response, getattr(
+                    settings, 'PAGE_CACHE_TIMEOUT', PAGE_CACHE_TIMEOUT
+                ))
+            )
+        return response
+
+    def select_feed_related(self, posts):
+        return posts.select_related(
+            *self.related_fields
+        ).prefetch_related(
+            *self.prefetch_fields
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attach_card_versions(list(context['page_obj']))
+        context['card_cache_timeout'] = getattr(
+            settings, 'CARD_CACHE_TIMEOUT', CARD_CACHE_TIMEOUT
+        )
+        return context
+
+    def get_feed_scope(self):
+        raise NotImplementedError(
+            'Определите get_feed_scope() в представлении ленты'
+        )
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            cache_key=feed_count_key(self.get_feed_scope()),
+            timeout=getattr(
+                settings, 'FEED_COUNT_TIMEOUT', FEED_COUNT_TIMEOUT
+            ),
+            estimate_threshold=getattr(
+                settings, 'FEED_COUNT_ESTIMATE_THRESHOLD',
+                FEED_COUNT_ESTIMATE_THRESHOLD
+            ),
+            **kwargs
+        )
+
+    def is_keyset_paginated(self):
+        if self.keyset_pagination is not None:
+            return self.keyset_pagination
+        return getattr(settings, 'KEYSET_PAGINATION', KEYSET_PAGINATION)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.is_keyset_paginated():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
 class CommentMixin:
     model = Comment
     form_class = CommentForm
@@ -24,8 +129,37 @@ class CommentMixin:
         )
 
 
+class CommentPageMixin:
+    """
+    Курсорная пагинация комментариев поста по (created_at, id):
+    страница выбирается по индексу без OFFSET и COUNT(*).
+    """
+
+    def get_comments_page(self, post, cursor=None):
+        paginator = KeysetPaginator(
+            post.comments.select_related('author'),
+            getattr(settings, 'COMMENTS_PER_PAGE', COMMENTS_PER_PAGE),
+            ordering=('created_at', 'id'),
+        )
+        try:
+            return paginator.page(cursor)
+        except InvalidPage as error:
+            raise Http404(str(error))
+
+
 class DispatchMixin:
+    """
+    Пускает к редактированию и удалению только автора объекта.
+    Объект загружается один раз за запрос и переиспользуется
+    представлениями UpdateView и DeleteView.
+    """
+
+    def get_object(self, queryset=None):
+        if getattr(self, '_dispatch_object', None) is None:
+            self._dispatch_object = super().get_object(queryset=queryset)
+        return self._dispatch_object
+
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.id:
             return redirect('blog:post_detail', post_id=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
@@ -1,9 +1,12 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 from blog.constants import (LENGTH_OF_CATEGORY_TITLE, LENGTH_OF_COMMENT_TEXT,
                             LENGTH_OF_LOCATION_NAME, LENGTH_OF_POST_TITLE,
                             LENGTH_OF_STRING)
+from blog.images import image_variant_names
+from blog.storage import post_image_storage
 from core.models import PublishedModel
 
 User = get_user_model()
@@ -28,11 +31,21 @@ class Category(PublishedModel):
                    'цифры, дефис и подчёркивание.'),
         verbose_name='Идентификатор'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
         ordering = ('title',)
+        indexes = (
+            models.Index(
+                fields=('is_published',),
+                name='category_published_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title[:LENGTH_OF_CATEGORY_TITLE]
@@ -47,6 +60,10 @@ class Location(PublishedModel):
         max_length=LENGTH_OF_STRING,
         verbose_name='Название места'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         verbose_name = 'местоположение'
@@ -74,9 +91,16 @@ class Post(PublishedModel):
     )
     image = models.ImageField(
         upload_to='posts_images',
+        storage=post_image_storage,
         blank=True,
+        db_index=True,
         verbose_name='Фото'
     )
+    image_variants_ready = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Уменьшенные копии фото готовы'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -98,15 +122,80 @@ class Post(PublishedModel):
         related_name='posts',
         verbose_name='Категория'
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category', 'is_published', '-pub_date'),
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return f'{self.title}'[:LENGTH_OF_POST_TITLE]
 
+    @property
+    def image_urls(self):
+        """
+        Адреса уменьшенных копий фото (feed, feed_webp, detail, ...).
+        Пока копии не готовы, возвращается пустой словарь
+        и шаблоны показывают оригинал.
+        """
+        if not self.image or not self.image_variants_ready:
+            return {}
+        return {
+            variant: self.image.storage.url(name)
+            for variant, name in image_variant_names(self.image.name).items()
+        }
+
+
+class PostSearchEntry(models.Model):
+    """
+    Строка таблицы полнотекстового индекса SQLite (FTS5) для публикации.
+    Таблицу создаёт и ведёт приложение (blog.search), модель нужна,
+    чтобы присоединять индекс к выборке публикаций одним JOIN.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search_entry',
+        verbose_name='Публикация'
+    )
+    # Скрытый столбец FTS5 с именем таблицы: для MATCH и bm25()
+    document = models.TextField(
+        db_column='blog_post_fts',
+        verbose_name='Документ'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
+        verbose_name = 'поисковый индекс публикации'
+        verbose_name_plural = 'Поисковый индекс публикаций'
+
 
 class Comment(models.Model):
     """Модель комментариев"""
@@ -124,6 +213,10 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Опубликован'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменён'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -134,6 +227,78 @@ class Comment(models.Model):
         verbose_name = 'комментарии'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:LENGTH_OF_COMMENT_TEXT]
+
+
+class ImageJob(models.Model):
+    """Модель задания фоновой обработки фото публикации"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация'
+    )
+    image = models.CharField(
+        max_length=LENGTH_OF_STRING,
+        verbose_name='Фото'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить не раньше'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created_at'),
+                name='imagejob_status_created_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
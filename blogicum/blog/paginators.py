@@ -0,0 +1,215 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Sequence
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blog.constants import ADMIN_COUNT_ESTIMATE_THRESHOLD
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(InvalidPage):
+    """Курсор страницы повреждён или не относится к этой ленте"""
+
+
+def estimate_count(queryset):
+    """
+    Оценка количества строк по плану запроса PostgreSQL.
+    Для других СУБД оценки нет, возвращается None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который хранит общее количество объектов в кэше
+    под ключом cache_key в течение timeout секунд.
+    Если задан estimate_threshold и планировщик оценивает выборку
+    не меньше чем в estimate_threshold строк, вместо точного COUNT(*)
+    используется эта оценка.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None, timeout=None,
+                 estimate_threshold=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+        self.estimate_threshold = estimate_threshold
+
+    def count_objects(self):
+        if self.estimate_threshold is not None:
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return Paginator.count.func(self)
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self.count_objects()
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self.count_objects()
+            cache.set(self.cache_key, count, self.timeout)
+        return count
+
+
+class EstimatedCountPaginator(CachedCountPaginator):
+    """
+    Paginator списков админ-зоны: для больших таблиц показывает
+    оценку планировщика вместо точного COUNT(*).
+    Порог задаётся настройкой ADMIN_COUNT_ESTIMATE_THRESHOLD.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True):
+        super().__init__(
+            object_list,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            estimate_threshold=getattr(
+                settings, 'ADMIN_COUNT_ESTIMATE_THRESHOLD',
+                ADMIN_COUNT_ESTIMATE_THRESHOLD
+            ),
+        )
+
+
+class KeysetPage(Sequence):
+    """
+    Страница курсорной пагинации.
+    Повторяет ту часть интерфейса django.core.paginator.Page,
+    которая нужна шаблонам, но вместо номеров страниц хранит
+    непрозрачные курсоры соседних страниц.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Курсорная (keyset) пагинация по уникальному набору полей ordering.
+    Следующая страница выбирается условием WHERE по значениям ключа
+    последней записи, поэтому глубокие страницы не требуют OFFSET,
+    а запрос COUNT(*) не выполняется вовсе.
+    Все поля ordering должны сортироваться в одном направлении.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+        self.descending = self.ordering[0].startswith('-')
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            self.object_list.model._meta.get_field(field).value_to_string(obj)
+            for field in self.fields
+        ]
+        payload = json.dumps([direction, values], separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(urlsafe_b64decode(padded))
+            if (direction not in (NEXT, PREVIOUS)
+                    or len(values) != len(self.fields)):
+                raise ValueError(cursor)
+            return direction, [
+                self.object_list.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception as error:
+            raise InvalidCursor('Некорректный курсор страницы') from error
+
+    def _seek(self, values, after):
+        """Условие «строго после» (или «строго до») ключа values"""
+        lookup = 'lt' if self.descending == after else 'gt'
+        conditions = []
+        for position, field in enumerate(self.fields):
+            condition = {
+                previous: value for previous, value
+                in zip(self.fields[:position], values)
+            }
+            condition[f'{field}__{lookup}'] = values[position]
+            conditions.append(Q(**condition))
+        return reduce(or_, conditions)
+
+    def page(self, cursor=None):
+        ordering = self.ordering
+        direction = NEXT
+        queryset = self.object_list
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                self._seek(values, after=direction == NEXT)
+            )
+        if direction == PREVIOUS:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            )
+        objects = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if direction == PREVIOUS:
+            objects.reverse()
+            has_next, has_previous = bool(cursor), has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        return KeysetPage(
+            objects,
+            self,
+            next_cursor=(
+                self.encode_cursor(objects[-1], NEXT)
+                if has_next and objects else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(objects[0], PREVIOUS)
+                if has_previous and objects else None
+            ),
+        )
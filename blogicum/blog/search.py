@@ -0,0 +1,147 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+from blog.models import Post
+
+# Полнотекстовый индекс публикаций по заголовку и тексту.
+# SQLite: отдельная таблица FTS5, которую синхронизируют сигналы.
+# PostgreSQL: GIN-индекс по выражению tsvector прямо на blog_post,
+# его поддерживает сама база, и синхронизация не нужна.
+SEARCH_TABLE = 'blog_post_fts'
+SEARCH_CONFIG = 'russian'
+PG_DOCUMENT = (
+    f"to_tsvector('{SEARCH_CONFIG}', "
+    "coalesce(blog_post.title, '') || ' ' || coalesce(blog_post.text, ''))"
+)
+PG_QUERY = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+# Вес совпадения в заголовке относительно совпадения в тексте (FTS5 bm25)
+TITLE_WEIGHT = 10.0
+
+
+def uses_search_table():
+    """Нужна ли базе отдельная таблица индекса, которую ведёт приложение"""
+    return connection.vendor == 'sqlite'
+
+
+def index_post(post):
+    if not uses_search_table():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [post.pk, post.title, post.text]
+        )
+
+
+def unindex_post(post_id):
+    if not uses_search_table():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post_id]
+        )
+
+
+def index_posts(rows):
+    """Добавляет в индекс новые публикации: rows — (pk, title, text)"""
+    if not uses_search_table() or not rows:
+        return
+    with connection.cursor() as cursor:
+        _insert_rows(cursor, rows)
+
+
+def rebuild_search_index(chunk_size=2000):
+    """
+    Заново строит таблицу индекса по всем публикациям порциями
+    по chunk_size. Возвращает количество проиндексированных публикаций.
+    Для PostgreSQL индекс строит сама база, поэтому только считает посты.
+    """
+    if not uses_search_table():
+        return Post.objects.count()
+    total = 0
+    rows = []
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        posts = Post.objects.order_by().values_list('pk', 'title', 'text')
+        for row in posts.iterator(chunk_size=chunk_size):
+            rows.append(row)
+            if len(rows) == chunk_size:
+                total += _insert_rows(cursor, rows)
+                rows = []
+        total += _insert_rows(cursor, rows)
+    return total
+
+
+def _insert_rows(cursor, rows):
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) VALUES (%s, %s, %s)',
+        rows
+    )
+    return len(rows)
+
+
+def build_match_query(query):
+    """
+    Запрос FTS5 из пользовательского ввода: каждое слово берётся
+    в кавычки, поэтому операторы и спецсимволы FTS5 не ломают запрос.
+    Пустая строка — в запросе нет слов.
+    """
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', query))
+
+
+class Match(Func):
+    """Условие FTS5: столбец MATCH запрос"""
+
+    template = '%(expressions)s'
+    arg_joiner = ' MATCH '
+    output_field = BooleanField()
+
+
+class Rank(Func):
+    """Релевантность FTS5: bm25() со знаком минус, чем больше, тем лучше"""
+
+    function = 'bm25'
+    template = '-%(function)s(%(expressions)s)'
+    output_field = FloatField()
+
+
+def search_posts(posts, query):
+    """
+    Отбирает из posts публикации, подходящие под запрос query,
+    и сортирует их по релевантности (post.rank, чем больше, тем лучше),
+    а при равной релевантности — по дате публикации.
+    Для баз без полнотекстового индекса — поиск подстроки
+    в заголовке и тексте без ранжирования.
+    """
+    match = build_match_query(query)
+    if not match:
+        return posts.none()
+    if connection.vendor == 'postgresql':
+        posts = posts.filter(RawSQL(
+            f'{PG_DOCUMENT} @@ {PG_QUERY}', [query],
+            output_field=BooleanField()
+        )).annotate(rank=RawSQL(
+            f'ts_rank({PG_DOCUMENT}, {PG_QUERY})', [query],
+            output_field=FloatField()
+        ))
+    elif uses_search_table():
+        # Индекс присоединяется к публикациям (INNER JOIN: иначе SQLite
+        # не выполнит MATCH), и один MATCH даёт и отбор, и релевантность
+        document = F('search_entry__document')
+        posts = posts.filter(
+            Match(document, Value(match)), search_entry__isnull=False
+        ).annotate(rank=Rank(
+            document, Value(TITLE_WEIGHT), Value(1.0)
+        ))
+    else:
+        posts = posts.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        ).annotate(rank=Value(0.0, output_field=FloatField()))
+    return posts.order_by('-rank', '-pub_date')
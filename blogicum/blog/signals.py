@@ -0,0 +1,203 @@
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import (ALL_SCOPE, category_scope, forget_category,
+                        invalidate_cards, invalidate_feed_counts,
+                        invalidate_pages, post_feed_scopes)
+from blog.jobs import enqueue_image_job
+from blog.media import release_image_on_commit
+from blog.models import Category, Comment, Location, Post, User
+from blog.search import index_post, unindex_post
+
+# Поля поста, от которых зависит, в какие ленты и как он попадает
+FEED_FIELDS = ('is_published', 'pub_date', 'category_id', 'author_id')
+
+
+@receiver(pre_save, sender=Post)
+def remember_feed_fields(sender, instance, raw=False, **kwargs):
+    """
+    Запоминает значения полей ленты и фото до сохранения поста.
+    При замене фото его уменьшенные копии считаются неготовыми.
+    """
+    instance._feed_fields_before = None
+    instance._image_before = ''
+    instance._image_changed = bool(instance.image)
+    if instance.pk is not None and not raw:
+        before = sender.objects.filter(
+            pk=instance.pk
+        ).values('image', *FEED_FIELDS).first()
+        if before is not None:
+            instance._image_before = before.pop('image')
+            instance._image_changed = (
+                instance._image_before != (instance.image.name or '')
+            )
+            instance._feed_fields_before = before
+    if instance._image_changed:
+        instance.image_variants_ready = False
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_processing(sender, instance, raw=False, **kwargs):
+    """
+    Ставит новое фото публикации в очередь фоновой обработки
+    (manage.py process_image_jobs); до её окончания
+    шаблоны показывают оригинал.
+    """
+    if raw or not getattr(instance, '_image_changed', False):
+        return
+    instance._image_changed = False
+    release_image_on_commit(instance._image_before)
+    if instance.image:
+        enqueue_image_job(instance)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_feeds(sender, instance, created, **kwargs):
+    """
+    Сбрасывает кэш страниц лент, в которых был или стал виден пост,
+    и кэш количества постов в них, если пост опубликован,
+    снят с публикации или перенесён в другую ленту.
+    """
+    before = getattr(instance, '_feed_fields_before', None)
+    after = {field: getattr(instance, field) for field in FEED_FIELDS}
+    changed = [after] + ([before] if before else [])
+    scopes = post_feed_scopes(
+        category_ids=[fields['category_id'] for fields in changed],
+        author_ids=[fields['author_id'] for fields in changed],
+    )
+    invalidate_pages(scopes)
+    invalidate_cards([instance.pk])
+    if created or before != after:
+        invalidate_feed_counts(scopes)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_post_image(sender, instance, **kwargs):
+    """
+    Удаляет фото удалённой публикации (в том числе при каскадном
+    удалении автора), если на него не ссылаются другие публикации.
+    """
+    release_image_on_commit(instance.image.name)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_feeds(sender, instance, **kwargs):
+    scopes = post_feed_scopes(
+        category_ids=[instance.category_id],
+        author_ids=[instance.author_id],
+    )
+    invalidate_pages(scopes)
+    invalidate_cards([instance.pk])
+    invalidate_feed_counts(scopes)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, **kwargs):
+    forget_category(instance.pk)
+    invalidate_feed_counts(post_feed_scopes() | {
+        category_scope(instance.pk)
+    })
+    invalidate_pages({ALL_SCOPE})
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_feeds(sender, instance, **kwargs):
+    invalidate_pages({ALL_SCOPE})
+
+
+@receiver(pre_delete, sender=Location)
+def touch_location_posts(sender, instance, **kwargs):
+    """
+    Удаление местоположения убирает его из постов без сигналов
+    (SET_NULL), поэтому время изменения постов обновляется здесь
+    для Last-Modified их страниц.
+    """
+    Post.objects.filter(location=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None,
+                      **kwargs):
+    """Запоминает имя пользователя до сохранения, если оно сохраняется"""
+    instance._username_before = None
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    if instance.pk is not None and not raw:
+        instance._username_before = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_feeds(sender, instance, created, **kwargs):
+    """
+    Имя автора видно в карточках и на страницах его постов: при смене
+    имени сбрасываются карточки и ленты, в которых они показываются,
+    и обновляется время изменения постов для Last-Modified.
+    Регистрация, вход на сайт, смена пароля и профиля не в счёт.
+    """
+    before = getattr(instance, '_username_before', None)
+    if created or before is None or before == instance.username:
+        return
+    posts = Post.objects.filter(author=instance)
+    posts.update(updated_at=timezone.now())
+    posts = list(posts.values_list('pk', 'category_id'))
+    post_ids = [post_id for post_id, category_id in posts]
+    invalidate_cards(post_ids)
+    invalidate_pages(post_feed_scopes(
+        category_ids={category_id for post_id, category_id in posts},
+        author_ids=[instance.pk],
+    ))
+
+
+def invalidate_commented_post_feeds(post_id):
+    invalidate_cards([post_id])
+    post = Post.objects.filter(pk=post_id).values(
+        'category_id', 'author_id'
+    ).first()
+    if post is not None:
+        invalidate_pages(post_feed_scopes(
+            category_ids=[post['category_id']],
+            author_ids=[post['author_id']],
+        ))
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста при добавлении комментария"""
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now()
+        )
+        invalidate_commented_post_feeds(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев поста при удалении комментария,
+    в том числе из админ-зоны и при каскадном удалении.
+    """
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now()
+    )
+    invalidate_commented_post_feeds(instance.post_id)
@@ -0,0 +1,51 @@
+import posixpath
+from hashlib import sha256
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+    """
+    Хранилище, которое называет файлы по SHA-256 содержимого:
+    posts_images/photo.jpg -> posts_images/<sha256>.jpg.
+    Одинаковые загрузки получают одно имя и хранятся одним файлом.
+    Ссылки на файл считаются по строкам базы (blog.media),
+    файл удаляется, когда на него не остаётся ссылок.
+    """
+
+    content_addressed = True
+
+    def hashed_name(self, name, content):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name), f'{digest.hexdigest()}{extension}'
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def save_derivative(self, name, content):
+        """
+        Сохраняет производный файл (уменьшенную копию) под точным
+        именем name, перезаписывая прежний.
+        """
+        if self.exists(name):
+            self.delete(name)
+        return super().save(name, content)
+
+
+post_image_storage = ContentHashStorage()
@@ -0,0 +1,223 @@
+import json
+from datetime import datetime
+from itertools import groupby
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from blog.models import Category, Comment, Location, Post, User
+from blog.search import index_posts
+from blog.utils import recount_comment_counts
+
+# Что переносят команды export_blog и import_blog, в порядке выгрузки:
+# (метка записи, модель, поле-ключ, поля, связи {поле: (модель, ключ)}).
+# Пользователи и категории сопоставляются по имени и slug,
+# остальные объекты сохраняют первичные ключи.
+TRANSFER_MODELS = (
+    ('user', User, 'username', (
+        'username', 'email', 'first_name', 'last_name', 'password',
+        'is_active', 'is_staff', 'is_superuser', 'date_joined', 'last_login',
+    ), {}),
+    ('category', Category, 'slug', (
+        'slug', 'title', 'description', 'is_published', 'created_at',
+    ), {}),
+    ('location', Location, 'id', (
+        'id', 'name', 'is_published', 'created_at',
+    ), {}),
+    ('post', Post, 'id', (
+        'id', 'title', 'text', 'pub_date', 'image', 'image_variants_ready',
+        'is_published', 'created_at',
+    ), {
+        'author': (User, 'username'),
+        'category': (Category, 'slug'),
+        'location': (Location, 'id'),
+    }),
+    ('comment', Comment, 'id', (
+        'id', 'text', 'created_at',
+    ), {
+        'post': (Post, 'id'),
+        'author': (User, 'username'),
+    }),
+)
+SPECS = {spec[0]: spec for spec in TRANSFER_MODELS}
+# Поля, по которым объект с тем же первичным ключом считается тем же
+# самым объектом, а не другим объектом базы, в которую идёт загрузка
+IDENTITY_FIELDS = {
+    'location': ('name', 'created_at'),
+    'post': ('title', 'created_at'),
+    'comment': ('text', 'created_at'),
+}
+
+
+class TransferConflict(ValueError):
+    """В базе уже есть другой объект с ключом из выгрузки"""
+
+
+class TransferEncoder(DjangoJSONEncoder):
+    """Даты выгружаются с микросекундами, а не до миллисекунд"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def relation_lookup(field, key):
+    return f'{field}_id' if key == 'id' else f'{field}__{key}'
+
+
+def export_records(chunk_size):
+    """
+    Записи выгрузки по одной: строки читаются из базы
+    порциями по chunk_size без загрузки всей таблицы в память.
+    """
+    for label, model, key, fields, relations in TRANSFER_MODELS:
+        lookups = {
+            relation_lookup(field, relation_key): field
+            for field, (_, relation_key) in relations.items()
+        }
+        rows = model.objects.order_by(key).values(*fields, *lookups)
+        for row in rows.iterator(chunk_size=chunk_size):
+            for lookup, field in lookups.items():
+                row[field] = row.pop(lookup)
+            yield label, row
+
+
+def dump_record(label, row):
+    return json.dumps(
+        {'model': label, **row}, cls=TransferEncoder, ensure_ascii=False
+    )
+
+
+def read_records(lines):
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            label = record.pop('model')
+        except (ValueError, KeyError) as error:
+            raise ValueError(f'Строка {number}: {error}') from error
+        if label not in SPECS:
+            raise ValueError(f'Строка {number}: неизвестная модель {label}')
+        yield label, record
+
+
+def batches(records, chunk_size):
+    """Подряд идущие записи одной модели порциями по chunk_size"""
+    for label, group in groupby(records, key=lambda record: record[0]):
+        batch = []
+        for _, record in group:
+            batch.append(record)
+            if len(batch) == chunk_size:
+                yield label, batch
+                batch = []
+        if batch:
+            yield label, batch
+
+
+def resolve_relations(model, relations, records):
+    """
+    Заменяет ключи связей записей на первичные ключи: по одному
+    запросу на связь для всей порции. Записи, у которых не нашёлся
+    обязательный связанный объект, отбрасываются.
+    """
+    for field, (related_model, key) in relations.items():
+        values = {record[field] for record in records} - {None}
+        found = dict(related_model.objects.filter(
+            **{f'{key}__in': values}
+        ).values_list(key, 'pk'))
+        nullable = model._meta.get_field(field).null
+        resolved = []
+        for record in records:
+            related_id = found.get(record.pop(field))
+            if related_id is None and not nullable:
+                continue
+            record[f'{field}_id'] = related_id
+            resolved.append(record)
+        records = resolved
+    return records
+
+
+@transaction.atomic
+def import_batch(label, records):
+    """
+    Создаёт объекты одной порции записей одним bulk_create.
+    Объекты, которые уже есть в базе (по полю-ключу), пропускаются;
+    если под тем же первичным ключом в базе другой объект
+    (не совпадают поля IDENTITY_FIELDS), порция отменяется
+    исключением TransferConflict.
+    Возвращает количество созданных объектов.
+    """
+    _, model, key, fields, relations = SPECS[label]
+    records = resolve_relations(model, relations, records)
+    identity = IDENTITY_FIELDS.get(label, ())
+    existing = {
+        row.pop(key): row for row in model.objects.filter(
+            **{f'{key}__in': [record[key] for record in records]}
+        ).values(key, *identity)
+    }
+    objects = []
+    for record in records:
+        values = {
+            name: model._meta.get_field(name).to_python(value)
+            for name, value in record.items() if not name.endswith('_id')
+        }
+        values.update(
+            (name, value) for name, value in record.items()
+            if name.endswith('_id')
+        )
+        if values[key] in existing:
+            check_identity(label, values, existing[values[key]])
+            continue
+        existing[values[key]] = {name: values[name] for name in identity}
+        objects.append(model(**values))
+    created_at = [getattr(obj, 'created_at', None) for obj in objects]
+    model.objects.bulk_create(objects, ignore_conflicts=True)
+    if 'created_at' in fields and objects:
+        restore_created_at(model, key, objects, created_at)
+    if model is Post:
+        index_posts([(post.pk, post.title, post.text) for post in objects])
+    if model is Comment:
+        recount_comment_counts(Post.objects.filter(
+            pk__in={comment.post_id for comment in objects}
+        ))
+    return len(objects)
+
+
+def check_identity(label, values, stored):
+    for name, value in stored.items():
+        if values[name] != value:
+            raise TransferConflict(
+                f'{label} {values["id"]}: в базе другой объект с тем же '
+                f'ключом (не совпадает {name}); загрузка возможна только '
+                f'в пустую базу или в базу, из которой сделана выгрузка'
+            )
+
+
+def restore_created_at(model, key, objects, created_at):
+    """
+    bulk_create заменяет значения auto_now_add текущим временем,
+    поэтому исходные даты создания возвращаются отдельным bulk_update.
+    """
+    for obj, value in zip(objects, created_at):
+        obj.created_at = value
+    if key != 'id':
+        ids = dict(model.objects.filter(
+            **{f'{key}__in': [getattr(obj, key) for obj in objects]}
+        ).values_list(key, 'pk'))
+        for obj in objects:
+            obj.pk = ids[getattr(obj, key)]
+    model.objects.bulk_update(objects, ['created_at'])
+
+
+def reset_sequences():
+    """Счётчики первичных ключей после вставки объектов с явными ключами"""
+    models = [spec[1] for spec in TRANSFER_MODELS if spec[2] == 'id']
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
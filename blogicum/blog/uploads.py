@@ -0,0 +1,54 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from blog.constants import POST_IMAGE_MAX_BYTES
+
+
+def get_upload_max_bytes():
+    return getattr(settings, 'POST_IMAGE_MAX_BYTES', POST_IMAGE_MAX_BYTES)
+
+
+class RejectedUploadedFile(UploadedFile):
+    """
+    Файл, отброшенный при загрузке из-за превышения размера.
+    Содержимое не хранится, известен только размер: по нему
+    форма показывает ошибку валидации.
+    """
+
+    rejected = True
+
+    def __init__(self, name, size, content_type, charset):
+        super().__init__(BytesIO(), name, content_type, size, charset)
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """
+    Обработчик загрузки, который считает байты по мере поступления
+    файла и перестаёт передавать их следующим обработчикам, как только
+    превышен POST_IMAGE_MAX_BYTES. Большой файл не попадает ни в память,
+    ни во временный файл целиком.
+    Должен стоять первым в FILE_UPLOAD_HANDLERS.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.max_bytes = get_upload_max_bytes()
+        self.received = 0
+        self.rejected = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.rejected = True
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.rejected:
+            return None
+        return RejectedUploadedFile(
+            self.file_name, self.received, self.content_type, self.charset
+        )
@@ -6,9 +6,13 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('search/', views.PostSearchView.as_view(), name='search'),
     path('posts/<int:post_id>/',
          views.PostDetailView.as_view(),
          name='post_detail'),
+    path('posts/<int:post_id>/comments/',
+         views.CommentListView.as_view(),
+         name='comments'),
     path('posts/create/',
          views.PostCreateView.as_view(),
          name='create_post'),
@@ -1,22 +1,121 @@
-from django.db.models import Count
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
+from blog.cache import (invalidate_cards, invalidate_feed_counts,
+                        invalidate_pages, post_feed_scopes)
+from blog.constants import PUB_DATE_GRANULARITY
+from blog.models import Comment, Post
+
+
+def get_pub_date_cutoff():
+    """
+    Граница видимости публикаций для текущего запроса.
+    Если настройка проекта PUB_DATE_GRANULARITY больше одной секунды,
+    текущее время округляется вниз до этого шага: в пределах одного шага
+    запросы к ленте совпадают и лучше кэшируются, а отложенный пост
+    появляется с задержкой до одного шага, но никогда не раньше срока.
+    По умолчанию используется точное время.
+    """
+    now = timezone.now()
+    granularity = getattr(
+        settings, 'PUB_DATE_GRANULARITY', PUB_DATE_GRANULARITY
+    )
+    if granularity <= 1:
+        return now
+    timestamp = now.timestamp() // granularity * granularity
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
 
 def filtered_select_posts(posts):
     """
     Функция с кодом, который повторяется в представлениях blog.views:
-    pub_date__lte=timezone.now() - Дата публикации — не позже текущего времени;
+    pub_date__lte=get_pub_date_cutoff() - Дата публикации — не позже
+    времени отсечки текущего запроса;
     is_published=True - Пост разрешён к публикации;
     category__is_published=True - Категория разрешена к публикации;
-    comment_count=Count('comments') - Подсчёт количества комментариев;
     order_by('-pub_date') - Сортировка публикаций по дате.
     """
-    return posts.select_related(
-        'location', 'category', 'author'
-    ).filter(
-        pub_date__lte=timezone.now(),
+    return posts.filter(
+        pub_date__lte=get_pub_date_cutoff(),
         is_published=True,
         category__is_published=True
-    ).annotate(
-        comment_count=Count('comments')
     ).order_by('-pub_date')
+
+
+def recount_comment_counts(posts=None):
+    """
+    Пересчитывает хранимое поле comment_count одним UPDATE-запросом
+    для всех постов или для переданного набора posts.
+    Возвращает количество обновлённых постов.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    comments = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(
+        total=Count('pk')
+    ).values('total')
+    return posts.update(
+        comment_count=Coalesce(Subquery(comments), Value(0))
+    )
+
+
+def is_post_visible(post):
+    """
+    Проверка filtered_select_posts для уже загруженного поста
+    (категория должна быть получена через select_related).
+    """
+    return (
+        post.is_published
+        and post.category is not None
+        and post.category.is_published
+        and post.pub_date <= get_pub_date_cutoff()
+    )
+
+
+def get_visible_post_or_404(queryset, user, **lookup):
+    """
+    Пост, который видит пользователь user: автор видит свои посты всегда,
+    остальные — только опубликованные (queryset должен подгружать
+    категорию через select_related).
+    """
+    post = get_object_or_404(queryset, **lookup)
+    if post.author_id != user.id and not is_post_visible(post):
+        raise Http404('Публикация не найдена')
+    return post
+
+
+def bulk_update_posts(posts, **fields):
+    """
+    Меняет поля fields у публикаций posts одним UPDATE-запросом.
+    update() не вызывает сигналы, поэтому кэш количества постов,
+    страниц лент и карточек сбрасывается здесь — для лент,
+    в которых посты были и в которые попадут.
+    Возвращает количество обновлённых публикаций.
+    """
+    with transaction.atomic():
+        rows = list(posts.order_by().values_list(
+            'pk', 'category_id', 'author_id'
+        ))
+        if not rows:
+            return 0
+        post_ids, category_ids, author_ids = zip(*rows)
+        updated = posts.order_by().update(
+            updated_at=timezone.now(), **fields
+        )
+    if 'category' in fields:
+        category_ids += (getattr(fields['category'], 'pk', None),)
+    scopes = post_feed_scopes(
+        category_ids=set(category_ids), author_ids=set(author_ids)
+    )
+    invalidate_feed_counts(scopes)
+    invalidate_pages(scopes)
+    invalidate_cards(post_ids)
+    return updated
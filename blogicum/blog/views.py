@@ -1,58 +1,175 @@
+from hashlib import md5
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.core.paginator import Paginator
+from django.db.models import Max
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag, urlencode
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 from django.views.generic.edit import ModelFormMixin
 
-from blog.constants import PAGINATOR
+from blog.cache import (INDEX_SCOPE, category_scope, get_published_category,
+                        profile_scope)
 from blog.forms import CommentForm
-from blog.mixins import CommentMixin, DispatchMixin, PostMixin
-from blog.models import Category, Post, User
-from blog.utils import filtered_select_posts
+from blog.mixins import (CommentMixin, CommentPageMixin, DispatchMixin,
+                         PostFeedMixin, PostMixin)
+from blog.models import Post, User
+from blog.search import search_posts
+from blog.utils import filtered_select_posts, get_visible_post_or_404
 
 
-class PostListView(ListView):
+class PostListView(PostFeedMixin, ListView):
     """CBV-класс для представления публикаций на главной странице"""
 
-    model = Post
     template_name = 'blog/index.html'
-    paginate_by = PAGINATOR
-    queryset = filtered_select_posts(
-        Post
-        .objects
-        .prefetch_related('comments')
-    )
+
+    def get_queryset(self):
+        return filtered_select_posts(
+            self.select_feed_related(Post.objects)
+        )
+
+    def get_feed_scope(self):
+        return INDEX_SCOPE
+
+
+class PostSearchView(PostFeedMixin, ListView):
+    """CBV-класс для полнотекстового поиска публикаций по запросу ?q="""
+
+    template_name = 'blog/search.html'
+    paginator_class = Paginator
+    # Результаты упорядочены по релевантности, курсор по дате не подходит
+    keyset_pagination = False
+    cache_anonymous_pages = False
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(
+            filtered_select_posts(self.select_feed_related(Post.objects)),
+            self.get_query()
+        )
+
+    def get_paginator(self, queryset, *args, **kwargs):
+        # Количество результатов зависит от запроса, поэтому не кэшируется
+        return super(PostFeedMixin, self).get_paginator(
+            queryset, *args, **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        context['page_query'] = urlencode({'q': context['query']}) + '&'
+        return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(CommentPageMixin, DetailView):
     """CBV-класс для представления страницы отдельной публикации"""
 
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
+    def get(self, request, *args, **kwargs):
+        """
+        Условный GET: пост со связями загружается одним запросом,
+        и при совпадении If-None-Match или If-Modified-Since ответ 304
+        отдаётся без загрузки комментариев и рендеринга шаблона.
+        """
+        self.object = self.get_object()
+        etag, last_modified = self.get_validators(self.object)
+        if not request.user.is_authenticated:
+            last_modified = int(last_modified.timestamp())
+        else:
+            # Страница вошедшего пользователя зависит не только от поста,
+            # поэтому для неё используется только ETag
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.render_to_response(
+                self.get_context_data(object=self.object)
+            )
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def get_validators(self, post):
+        """
+        Валидаторы страницы (ETag и время изменения) по данным базы,
+        загруженным вместе с постом. Учитываются время изменения поста,
+        его категории, местоположения и последнего комментария.
+        Массовые update() постов, смена имени автора и удаление
+        местоположения сами проставляют посту updated_at,
+        поэтому Last-Modified не отстаёт от содержимого страницы.
+        ETag зависит от пользователя и CSRF-секрета, чтобы не отдать
+        страницу с чужой формой комментария.
+        """
+        last_modified = max(
+            updated_at for updated_at in (
+                post.updated_at,
+                post.last_comment_at,
+                post.category.updated_at if post.category else None,
+                post.location.updated_at if post.location else None,
+            ) if updated_at is not None
+        )
+        etag = md5(':'.join(map(str, (
+            post.pk,
+            last_modified.isoformat(),
+            post.comment_count,
+            self.request.user.id,
+            self.request.META.get('CSRF_COOKIE'),
+        ))).encode()).hexdigest()
+        return quote_etag(etag), last_modified
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        # Только первая страница, остальные подгружает CommentListView
+        context['comments'] = self.get_comments_page(self.object)
         return context
 
     def get_object(self, queryset=None):
-        post = super().get_object(queryset=queryset)
-        if post.author == self.request.user:
-            return (get_object_or_404(
-                self.model.objects
-                .select_related(
-                    'location',
-                    'author',
-                    'category'
-                ),
-                pk=self.kwargs.get(self.pk_url_kwarg)))
-        return (get_object_or_404(
-            filtered_select_posts(self.model.objects),
-                pk=self.kwargs.get(self.pk_url_kwarg)))
+        return get_visible_post_or_404(
+            self.model.objects.select_related(
+                'location',
+                'author',
+                'category'
+            ).annotate(
+                last_comment_at=Max('comments__updated_at')
+            ),
+            self.request.user,
+            pk=self.kwargs.get(self.pk_url_kwarg))
+
+
+class CommentListView(CommentPageMixin, DetailView):
+    """
+    CBV-класс для подгрузки следующей страницы комментариев:
+    отдаёт HTML-фрагмент со списком комментариев по курсору ?cursor=
+    """
+
+    model = Post
+    template_name = 'includes/comment_list.html'
+    pk_url_kwarg = 'post_id'
+
+    def get_object(self, queryset=None):
+        return get_visible_post_or_404(
+            self.model.objects.select_related('category'),
+            self.request.user,
+            pk=self.kwargs.get(self.pk_url_kwarg))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments_page(
+            self.object, self.request.GET.get('cursor')
+        )
+        return context
 
 
 class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
@@ -109,23 +226,32 @@ class CommentDeleteView(LoginRequiredMixin, CommentMixin,
     """CBV-класс для удаления комментария к публикации"""
 
 
-class ProfileListView(ListView):
+class ProfileListView(PostFeedMixin, ListView):
     """CBV-класс для представления страницы пользователя"""
 
-    model = Post
     template_name = 'blog/profile.html'
-    paginate_by = PAGINATOR
+    # Автор у всех постов ленты один — это сам профиль
+    related_fields = ('location', 'category')
+
+    def get_profile(self):
+        if not hasattr(self, 'profile'):
+            self.profile = get_object_or_404(
+                User, username=self.kwargs.get('username'))
+        return self.profile
 
     def get_queryset(self):
-        profile = get_object_or_404(
-            User, username=self.kwargs.get('username'))
-        return profile.users.all().annotate(
-            comment_count=Count('comments')).order_by('-pub_date',)
+        return self.select_feed_related(
+            Post.objects.filter(author_id=self.get_profile().id)
+        ).order_by('-pub_date',)
+
+    def get_feed_scope(self):
+        return profile_scope(self.get_profile().id)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User, username=self.kwargs.get('username'))
+        context['profile'] = self.get_profile()
+        for post in context['object_list']:
+            post.author = self.profile
         return context
 
 
@@ -150,21 +276,27 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class CategoryListView(ListView):
+class CategoryListView(PostFeedMixin, ListView):
     """CBV-класс для представления страницы категории"""
 
-    model = Post
     template_name = 'blog/category.html'
-    paginate_by = PAGINATOR
     slug_url_kwarg = 'category_slug'
 
+    def get_category(self):
+        if not hasattr(self, 'category'):
+            self.category = get_published_category(
+                self.kwargs.get(self.slug_url_kwarg))
+        return self.category
+
     def get_queryset(self):
-        category = get_object_or_404(
-            Category, slug=self.kwargs.get('category_slug'), is_published=True)
-        return filtered_select_posts(category.posts.all())
+        return filtered_select_posts(
+            self.select_feed_related(
+                Post.objects.filter(category_id=self.get_category().id)))
+
+    def get_feed_scope(self):
+        return category_scope(self.get_category().id)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category, slug=self.kwargs.get('category_slug'))
+        context['category'] = self.get_category()
         return context
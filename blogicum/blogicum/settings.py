@@ -38,11 +38,16 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# В production шаблоны читаются и компилируются один раз на процесс
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -50,10 +55,16 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
 
+# Компиляция всех шаблонов при запуске WSGI-процесса
+WARM_TEMPLATES_ON_STARTUP = not DEBUG
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
@@ -63,6 +74,16 @@ DATABASES = {
     }
 }
 
+# Страницы лент для гостей, карточки постов и их версии хранятся в кэше
+# процесса: другие процессы узнают об изменениях только по истечении
+# PAGE_CACHE_TIMEOUT и CARD_CACHE_TIMEOUT. Для нескольких процессов
+# нужен общий кэш, например файловый (см. settings_production).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -94,6 +115,11 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+# Раздача статики из STATIC_ROOT самим WSGI-приложением
+SERVE_STATIC_FILES = False
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = 'blog:index'
@@ -102,6 +128,13 @@ LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Загрузки больше POST_IMAGE_MAX_BYTES отбрасываются по мере получения
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploads.MaxSizeUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
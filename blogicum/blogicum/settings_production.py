@@ -0,0 +1,24 @@
+from blogicum.settings import *  # noqa: F401, F403
+
+# Статика с хэшем содержимого в именах и сжатыми копиями (collectstatic),
+# которую раздаёт сам WSGI-процесс с долгим кэшированием в браузере.
+# Копии .br создаются только с пакетом Brotli (requirements.txt)
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+SERVE_STATIC_FILES = True
+
+# Общий для всех процессов кэш: версии страниц и карточек, которые
+# сбрасывают сигналы, видны всем процессам сразу, поэтому карточки
+# можно хранить дольше. Запас MAX_ENTRIES выше ожидаемого количества
+# страниц, карточек и счётчиков версий, чтобы кэш не вытеснял записи
+# (по 300 записей по умолчанию) наугад
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',  # noqa: F405
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+        },
+    }
+}
+CARD_CACHE_TIMEOUT = 60 * 60
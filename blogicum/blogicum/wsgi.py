@@ -1,7 +1,22 @@
+import logging
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+if getattr(settings, 'SERVE_STATIC_FILES', False):
+    from core.static import StaticFilesMiddleware
+
+    application = StaticFilesMiddleware(application)
+
+if getattr(settings, 'WARM_TEMPLATES_ON_STARTUP', False):
+    from core.utils import warm_templates
+
+    for name, error in warm_templates()[1].items():
+        logging.getLogger(__name__).error(
+            'Шаблон %s не загружен: %s', name, error
+        )
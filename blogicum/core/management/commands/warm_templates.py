@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Загружает и проверяет все шаблоны проекта'
+
+    def handle(self, *args, **options):
+        warmed, errors = warm_templates()
+        for name, error in errors.items():
+            self.stderr.write(f'{name}: {type(error).__name__}: {error}')
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено шаблонов: {warmed}'
+        ))
@@ -0,0 +1,103 @@
+import mimetypes
+import os
+from urllib.parse import unquote
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_accept_encoding(header):
+    """
+    Кодировки из заголовка Accept-Encoding с их весами q:
+    {'gzip': 1.0, 'br': 0.0, ...}. Некорректный вес считается нулевым.
+    """
+    weights = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+    return weights
+
+
+def choose_encoding(header, available):
+    """
+    Кодировка из available (в порядке предпочтения сервера) с наибольшим
+    ненулевым весом q в заголовке Accept-Encoding или None.
+    """
+    weights = parse_accept_encoding(header)
+    default = weights.get('*', 0.0)
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, default)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class StaticFilesMiddleware:
+    """
+    WSGI-обёртка, раздающая собранную статику из STATIC_ROOT без
+    отдельного веб-сервера. Файлы с хэшем в имени (из манифеста
+    collectstatic) отдаются с заголовком Cache-Control immutable,
+    при поддержке клиентом — заранее сжатые копии .br или .gz.
+    Остальные запросы передаются приложению.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = os.path.realpath(root or settings.STATIC_ROOT)
+        self.prefix = prefix or settings.STATIC_URL
+        hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+        self.immutable = set(hashed_files.values())
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if (not path.startswith(self.prefix)
+                or environ['REQUEST_METHOD'] not in ('GET', 'HEAD')):
+            return self.application(environ, start_response)
+        name = unquote(path[len(self.prefix):])
+        full_path = os.path.realpath(os.path.join(self.root, name))
+        if (not full_path.startswith(self.root + os.sep)
+                or not os.path.isfile(full_path)):
+            return self.application(environ, start_response)
+        return self.serve(environ, start_response, name, full_path)
+
+    def serve(self, environ, start_response, name, full_path):
+        content_type = mimetypes.guess_type(full_path)[0]
+        headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', IMMUTABLE_CACHE_CONTROL
+             if name in self.immutable else DEFAULT_CACHE_CONTROL),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        extensions = {
+            encoding: extension for encoding, extension in ENCODINGS
+            if os.path.isfile(full_path + extension)
+        }
+        encoding = choose_encoding(
+            environ.get('HTTP_ACCEPT_ENCODING', ''), extensions
+        )
+        if encoding is not None:
+            full_path += extensions[encoding]
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(os.path.getsize(full_path))))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(full_path, 'rb'), BLOCK_SIZE)
@@ -0,0 +1,47 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+)
+# Сжатая копия создаётся, только если она заметно меньше оригинала
+MIN_COMPRESSION_RATIO = 0.95
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики с хэшем содержимого в именах файлов
+    (img/logo.png -> img/logo.3f2a1b.png) и заранее сжатыми
+    копиями .gz и, если установлен пакет brotli, .br.
+    Всё создаётся один раз при collectstatic.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        compressors = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            compressors.append(('.br', brotli.compress))
+        for extension, compress in compressors:
+            compressed = compress(data)
+            if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+                with open(path + extension, 'wb') as target:
+                    target.write(compressed)
+            elif os.path.exists(path + extension):
+                os.remove(path + extension)
@@ -0,0 +1,50 @@
+import os
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def iter_template_names(engine):
+    """Имена всех шаблонов из каталогов DIRS и каталогов приложений"""
+    template_dirs = list(engine.engine.dirs)
+    if engine.engine.app_dirs or any(
+        'app_directories' in str(loader) for loader in engine.engine.loaders
+    ):
+        template_dirs.extend(get_app_template_dirs('templates'))
+    seen = set()
+    for template_dir in template_dirs:
+        for root, dirs, files in os.walk(template_dir):
+            for filename in sorted(files):
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                name = os.path.relpath(
+                    os.path.join(root, filename), template_dir
+                ).replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def warm_templates():
+    """
+    Загружает и компилирует все шаблоны проекта, чтобы первые запросы
+    после запуска не тратили время на разбор шаблонов (при включённом
+    кэширующем загрузчике они остаются в памяти процесса).
+    Возвращает количество загруженных шаблонов и словарь ошибок
+    {имя шаблона: исключение}.
+    """
+    warmed, errors = 0, {}
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in iter_template_names(engine):
+            try:
+                engine.get_template(name)
+            except Exception as error:
+                errors[name] = error
+            else:
+                warmed += 1
+    return warmed, errors
@@ -10,6 +10,7 @@ from typing import (Any, Iterable, List, NamedTuple, Optional, Tuple, Type,
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Field, Model
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -32,6 +33,17 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from blog.cache import clear_category_cache
+
+    cache.clear()
+    clear_category_cache()
+    yield
+    cache.clear()
+    clear_category_cache()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -354,6 +366,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
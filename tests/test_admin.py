@@ -0,0 +1,260 @@
+import os
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST_URL = "/admin/blog/post/"
+# Полный бенчмарк со 100 тысячами пользователей долгий,
+# он запускается только с переменной окружения BLOG_BENCHMARK=1
+BENCHMARK_USERS = 100_000
+DEFAULT_USERS = 300
+benchmark = pytest.mark.skipif(
+    not os.environ.get("BLOG_BENCHMARK"),
+    reason="бенчмарк включается переменной окружения BLOG_BENCHMARK=1",
+)
+
+
+def create_users(count):
+    User = get_user_model()
+    password = make_password(None)
+    User.objects.bulk_create(
+        (
+            User(username=f"benchmark_{number}", password=password)
+            for number in range(count)
+        ),
+        batch_size=5000,
+    )
+    return count
+
+
+@pytest.fixture
+def many_users():
+    return create_users(DEFAULT_USERS)
+
+
+@pytest.fixture
+def benchmark_users():
+    """Бенчмарк: 100 тысяч пользователей, как на большом сайте"""
+    return create_users(BENCHMARK_USERS)
+
+
+@pytest.fixture
+def admin_posts(mixer, user, published_category, published_location):
+    return mixer.cycle(5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def test_changelist_does_not_load_all_users(
+        admin_posts, admin_client, many_users):
+    response = admin_client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+    assert "benchmark_" not in response.content.decode(), (
+        "Убедитесь, что список публикаций в админ-зоне не выводит "
+        "всех пользователей в выпадающих списках и фильтрах."
+    )
+
+
+@benchmark
+def test_changelist_benchmark(admin_posts, admin_client, benchmark_users):
+    start = time.monotonic()
+    response = admin_client.get(CHANGELIST_URL)
+    elapsed = time.monotonic() - start
+    assert response.status_code == 200
+    assert "benchmark_" not in response.content.decode()
+    assert elapsed < 5, (
+        f"Список публикаций в админ-зоне строится {elapsed:.1f} с "
+        f"при {benchmark_users} пользователях."
+    )
+
+
+def count_changelist_queries(admin_client):
+    with CaptureQueriesContext(connection) as queries:
+        assert admin_client.get(CHANGELIST_URL).status_code == 200
+    return len(queries)
+
+
+def test_changelist_queries_do_not_depend_on_users(admin_posts, admin_client):
+    expected = count_changelist_queries(admin_client)
+    create_users(DEFAULT_USERS)
+    assert count_changelist_queries(admin_client) == expected, (
+        "Убедитесь, что количество запросов списка публикаций "
+        "в админ-зоне не зависит от количества пользователей."
+    )
+
+
+def test_author_filter(admin_posts, admin_client, another_user, mixer):
+    other = mixer.blend("blog.Post", author=another_user)
+    response = admin_client.get(
+        CHANGELIST_URL, {"author": another_user.username}
+    )
+    assert list(response.context["cl"].result_list) == [other], (
+        "Убедитесь, что в админ-зоне публикации фильтруются по имени автора."
+    )
+
+
+INLINE_ROWS = 3
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(INLINE_ROWS * 2).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+@pytest.mark.parametrize("inline_url, changelist_url", [
+    ("/admin/blog/category/{post.category.id}/change/",
+     "/admin/blog/post/?category__id__exact={post.category.id}"),
+    ("/admin/blog/location/{post.location.id}/change/",
+     "/admin/blog/post/?location__id__exact={post.location.id}"),
+    ("/admin/blog/post/{post.id}/change/",
+     "/admin/blog/comment/?post__id__exact={post.id}"),
+])
+def test_inlines_show_recent_rows(
+        inline_url, changelist_url, settings, mixer, admin_client,
+        post_with_published_location, many_comments):
+    post = post_with_published_location
+    settings.ADMIN_INLINE_MAX_ROWS = INLINE_ROWS
+    mixer.cycle(INLINE_ROWS * 2).blend(
+        "blog.Post", category=post.category, location=post.location
+    )
+    response = admin_client.get(inline_url.format(post=post))
+    assert response.status_code == 200
+    (formset,) = [
+        inline.formset for inline in response.context["inline_admin_formsets"]
+    ]
+    assert len(formset.forms) == INLINE_ROWS, (
+        "Убедитесь, что встроенные формы админ-зоны показывают только "
+        "последние связанные объекты."
+    )
+    url = changelist_url.format(post=post)
+    assert url.replace("&", "&amp;") in response.content.decode()
+    changelist = admin_client.get(url).context["cl"]
+    assert changelist.result_count == formset.total_count > INLINE_ROWS, (
+        "Убедитесь, что ссылка под встроенной формой ведёт к списку "
+        "всех связанных объектов."
+    )
+
+
+def test_recent_inline_saves(
+        settings, admin_client, rf, admin_user,
+        post_with_published_location, many_comments):
+    from django.contrib.admin import site
+
+    from blog.admin import CommentInline
+
+    post = post_with_published_location
+    settings.ADMIN_INLINE_MAX_ROWS = INLINE_ROWS
+    request = rf.post("/")
+    request.user = admin_user
+    FormSet = CommentInline(type(post), site).get_formset(request, post)
+    recent = FormSet(instance=post).get_queryset()
+    prefix = FormSet.get_default_prefix()
+    data = {
+        f"{prefix}-TOTAL_FORMS": INLINE_ROWS,
+        f"{prefix}-INITIAL_FORMS": INLINE_ROWS,
+    }
+    for number, comment in enumerate(recent):
+        data.update({
+            f"{prefix}-{number}-id": comment.id,
+            f"{prefix}-{number}-post": post.id,
+            f"{prefix}-{number}-author": comment.author_id,
+            f"{prefix}-{number}-text": f"Исправлено {number}",
+        })
+    formset = FormSet(data, instance=post, prefix=prefix)
+    assert formset.is_valid(), formset.errors
+    formset.save()
+    assert [
+        comment.text for comment in type(recent[0]).objects.filter(
+            pk__in=[comment.id for comment in recent]
+        ).order_by("text")
+    ] == [f"Исправлено {number}" for number in range(INLINE_ROWS)]
+
+
+def run_action(admin_client, action, posts, **data):
+    return admin_client.post(CHANGELIST_URL, {
+        "action": action,
+        "_selected_action": [post.id for post in posts],
+        **data,
+    }, follow=True)
+
+
+@pytest.mark.parametrize("action, fields", [
+    ("publish_posts", {"is_published": True}),
+    ("unpublish_posts", {"is_published": False}),
+    ("clear_location", {"location": None}),
+])
+def test_bulk_actions(
+        action, fields, admin_posts, admin_client):
+    posts = admin_posts[:3]
+    response = run_action(admin_client, action, posts)
+    assert ": 3" in str(list(response.context["messages"])[0]), (
+        "Убедитесь, что действие сообщает количество изменённых публикаций."
+    )
+    for post in posts:
+        post.refresh_from_db()
+        for name, value in fields.items():
+            assert getattr(post, name) == value
+
+
+def test_move_to_category(admin_posts, admin_client, mixer, client):
+    category = mixer.blend("blog.Category", is_published=True)
+    url = f"/category/{category.slug}/"
+    assert not client.get(url).context["page_obj"].object_list
+    run_action(
+        admin_client, "move_to_category", admin_posts[:2],
+        category=category.id,
+    )
+    assert set(client.get(url).context["page_obj"]) == set(admin_posts[:2]), (
+        "Убедитесь, что после переноса публикаций в категорию кэш её "
+        "ленты и количества постов сброшен."
+    )
+
+
+def test_unpublish_purges_feeds(admin_posts, admin_client, client):
+    client.get("/")
+    run_action(admin_client, "unpublish_posts", admin_posts)
+    response = client.get("/")
+    assert not list(response.context["page_obj"]), (
+        "Убедитесь, что после массового снятия с публикации "
+        "кэш лент сброшен."
+    )
+
+
+def test_bulk_action_is_single_update(admin_posts, admin_client):
+    with CaptureQueriesContext(connection) as queries:
+        run_action(admin_client, "unpublish_posts", admin_posts)
+    updates = [
+        query["sql"] for query in queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1, (
+        "Убедитесь, что массовое действие меняет публикации "
+        "одним UPDATE-запросом."
+    )
+
+
+def test_bulk_action_on_search_results(admin_posts, admin_client):
+    found = admin_posts[0]
+    found.title = "Путешествие на Байкал"
+    found.save()
+    admin_client.post(f"{CHANGELIST_URL}?q=байкал", {
+        "action": "unpublish_posts",
+        "_selected_action": [post.id for post in admin_posts],
+    })
+    assert [
+        post.id for post in type(found).objects.filter(is_published=False)
+    ] == [found.id], (
+        "Убедитесь, что массовое действие на странице поиска меняет "
+        "только найденные публикации."
+    )
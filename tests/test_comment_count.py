@@ -0,0 +1,32 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    assert Post.objects.get(pk=post.pk).comment_count == 0
+    comments = mixer.cycle(3).blend(Comment, post=post)
+    assert Post.objects.get(pk=post.pk).comment_count == 3, (
+        "Убедитесь, что при добавлении комментария увеличивается "
+        "счётчик `comment_count` публикации."
+    )
+    comments[0].delete()
+    Comment.objects.filter(pk=comments[1].pk).delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 1, (
+        "Убедитесь, что при удалении комментария уменьшается "
+        "счётчик `comment_count` публикации."
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=10)
+    call_command("recount_comments", stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).comment_count == 2
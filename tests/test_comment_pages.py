@@ -0,0 +1,59 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+PER_PAGE = 5
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(PER_PAGE * 2 + 1).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+@override_settings(COMMENTS_PER_PAGE=PER_PAGE)
+def test_detail_renders_first_comments_page(
+        post_with_published_location, many_comments, client):
+    post = post_with_published_location
+    response = client.get(f"/posts/{post.id}/")
+    comments = list(response.context["comments"])
+    assert comments == many_comments[:PER_PAGE], (
+        "Убедитесь, что страница публикации показывает только первую "
+        "страницу комментариев."
+    )
+    assert f"/posts/{post.id}/comments/?cursor=" in response.content.decode()
+
+
+@override_settings(COMMENTS_PER_PAGE=PER_PAGE)
+def test_load_more_comments(
+        post_with_published_location, many_comments, client):
+    post = post_with_published_location
+    page = client.get(f"/posts/{post.id}/").context["comments"]
+    loaded = []
+    while page.has_next():
+        response = client.get(
+            f"/posts/{post.id}/comments/", {"cursor": page.next_cursor}
+        )
+        assert response.status_code == 200
+        assert "<html" not in response.content.decode(), (
+            "Убедитесь, что подгрузка комментариев отдаёт HTML-фрагмент."
+        )
+        page = response.context["comments"]
+        loaded.extend(page)
+    assert loaded == many_comments[PER_PAGE:], (
+        "Убедитесь, что подгрузка комментариев по курсору отдаёт "
+        "оставшиеся комментарии по порядку и без повторов."
+    )
+
+
+def test_load_more_comments_of_hidden_post(
+        post_with_published_location, client):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
+    assert client.get(
+        f"/posts/{post.id}/comments/", {"cursor": "broken"}
+    ).status_code == 404
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_detail(client, post, **headers):
+    return client.get(f"/posts/{post.id}/", **headers)
+
+
+def test_detail_not_modified(
+        post_with_published_location, client, django_assert_num_queries):
+    post = post_with_published_location
+    response = get_detail(client, post)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified"), (
+        "Убедитесь, что страница публикации для гостей отдаёт Last-Modified."
+    )
+    with django_assert_num_queries(1):
+        response = get_detail(client, post, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что при совпадении ETag страница публикации "
+        "отвечает 304 Not Modified."
+    )
+    response = get_detail(
+        client, post, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("change", ["post", "comment", "category"])
+def test_detail_etag_changes(
+        change, post_with_published_location, comment, mixer, client):
+    post = post_with_published_location
+    etag = get_detail(client, post)["ETag"]
+    if change == "post":
+        post.title = "Изменённый заголовок"
+        post.save()
+    elif change == "comment":
+        mixer.blend("blog.Comment", post=post)
+    else:
+        post.category.title = "Изменённая категория"
+        post.category.save()
+    response = get_detail(client, post, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and response["ETag"] != etag, (
+        "Убедитесь, что ETag страницы публикации меняется при изменении "
+        "публикации, комментариев или категории."
+    )
+
+
+def test_detail_etag_depends_on_user(
+        post_with_published_location, client, user_client):
+    post = post_with_published_location
+    etag = get_detail(client, post)["ETag"]
+    response = get_detail(user_client, post, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag страницы публикации зависит от пользователя."
+    )
+    assert not response.has_header("Last-Modified")
+
+
+def test_hidden_post_has_no_validators(
+        post_with_published_location, client):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = get_detail(client, post, HTTP_IF_NONE_MATCH="*")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("change", [
+    "delete_comment", "image", "category", "location", "delete_location",
+    "username",
+])
+def test_detail_last_modified_moves_forward(
+        change, post_with_published_location, mixer, client):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post)
+    hour_ago = timezone.now() - timedelta(hours=1)
+    Post.objects.filter(pk=post.pk).update(updated_at=hour_ago)
+    Comment.objects.filter(pk=comment.pk).update(updated_at=hour_ago)
+    Category.objects.filter(pk=post.category_id).update(updated_at=hour_ago)
+    Location.objects.filter(pk=post.location_id).update(updated_at=hour_ago)
+    since = get_detail(client, post)["Last-Modified"]
+    assert get_detail(
+        client, post, HTTP_IF_MODIFIED_SINCE=since
+    ).status_code == 304
+    if change == "delete_comment":
+        comment.delete()
+    elif change == "image":
+        call_command("process_image_jobs", "--once", stdout=StringIO())
+    elif change == "category":
+        post.category.title = "Изменённая категория"
+        post.category.save()
+    elif change == "location":
+        post.location.name = "Изменённое место"
+        post.location.save()
+    elif change == "delete_location":
+        post.location.delete()
+    else:
+        post.author.username = "renamed_author"
+        post.author.save()
+    response = get_detail(client, post, HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == 200, (
+        "Убедитесь, что Last-Modified страницы публикации меняется при "
+        "удалении комментария, обработке фото, изменении категории, "
+        "местоположения и имени автора."
+    )
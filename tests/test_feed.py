@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from conftest import N_PER_PAGE
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.utils import get_pub_date_cutoff
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(PUB_DATE_GRANULARITY=60)
+def test_pub_date_cutoff_is_rounded_down():
+    now = timezone.now()
+    cutoff = get_pub_date_cutoff()
+    assert cutoff.timestamp() % 60 == 0, (
+        "Убедитесь, что время отсечки публикаций округляется до шага "
+        "`PUB_DATE_GRANULARITY`."
+    )
+    assert now - timedelta(seconds=60) < cutoff <= now
+
+
+@override_settings(PUB_DATE_GRANULARITY=60)
+def test_scheduled_post_is_not_shown_early(
+        mixer, user, published_category, client):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=31)
+    )
+    assert post.title not in client.get("/").content.decode("utf-8")
+    assert client.get(f"/posts/{post.id}/").status_code == 404, (
+        "Убедитесь, что отложенная публикация не показывается "
+        "раньше даты публикации."
+    )
+
+
+def test_postponed_post_appears_without_restart(
+        mixer, user, published_category, client):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    assert post.title not in client.get("/").content.decode("utf-8")
+    post.pub_date = timezone.now() - timedelta(days=1)
+    post.save()
+    assert post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что отложенная публикация появляется на главной странице "
+        "после наступления даты публикации без перезапуска сервера."
+    )
+
+
+@override_settings(KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_feed(
+        many_posts_with_published_locations, client,
+        django_assert_num_queries):
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    with django_assert_num_queries(1):
+        response = client.get("/")
+    first_page = response.context["page_obj"]
+    assert list(first_page) == expected[:N_PER_PAGE], (
+        "Убедитесь, что при курсорной пагинации первая страница содержит "
+        "самые новые публикации и не требует запроса COUNT(*)."
+    )
+    assert not first_page.has_previous() and first_page.has_next()
+
+    second_page = client.get(
+        "/", {"cursor": first_page.next_cursor}
+    ).context["page_obj"]
+    assert list(second_page) == expected[N_PER_PAGE:N_PER_PAGE * 2]
+    assert not second_page.has_next() and second_page.has_previous()
+
+    back_page = client.get(
+        "/", {"cursor": second_page.previous_cursor}
+    ).context["page_obj"]
+    assert list(back_page) == expected[:N_PER_PAGE]
+    assert not back_page.has_previous()
+
+
+@override_settings(KEYSET_PAGINATION=True)
+def test_keyset_pagination_rejects_broken_cursor(client):
+    assert client.get("/", {"cursor": "broken"}).status_code == 404
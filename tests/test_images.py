@@ -0,0 +1,127 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import image_variant_names
+from blog.models import ImageJob, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def process_image_jobs():
+    call_command("process_image_jobs", "--once", stdout=StringIO())
+
+
+def test_image_is_processed_in_background(post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert not post.image_variants_ready and not post.image_urls, (
+        "Убедитесь, что фото обрабатывается не во время запроса, "
+        "а до окончания обработки показывается оригинал."
+    )
+    assert ImageJob.objects.filter(
+        post=post, status=ImageJob.PENDING
+    ).exists()
+    process_image_jobs()
+    post.refresh_from_db()
+    assert post.image_variants_ready, (
+        "Убедитесь, что обработчик очереди `process_image_jobs` создаёт "
+        "уменьшенные копии фото."
+    )
+    storage = post.image.storage
+    for name in image_variant_names(post.image.name).values():
+        assert storage.exists(name)
+    assert not ImageJob.objects.exclude(status=ImageJob.DONE).exists()
+
+
+def test_exif_is_stripped(mixer, user, published_category):
+    exif = Image.Exif()
+    exif[0x010F] = "Test camera"
+    img_io = BytesIO()
+    Image.new("RGB", (50, 50)).save(img_io, format="JPEG", exif=exif)
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ImageFile(img_io, name="exif_image.jpg"),
+    )
+    process_image_jobs()
+    post.refresh_from_db()
+    with post.image.open() as image_file:
+        assert not Image.open(image_file).getexif(), (
+            "Убедитесь, что при обработке фото из него удаляются EXIF-данные."
+        )
+
+
+def test_broken_image_job_fails(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ImageFile(BytesIO(b"not an image"), name="broken.jpg"),
+    )
+    jobs = ImageJob.objects.filter(post=post)
+    process_image_jobs()
+    process_image_jobs()
+    job = jobs.get()
+    assert job.status == ImageJob.PENDING and job.attempts == 1, (
+        "Убедитесь, что неудачное задание повторяется не сразу, "
+        "а после паузы."
+    )
+    assert job.run_after > timezone.now()
+    for _ in range(2):
+        jobs.update(run_after=timezone.now())
+        process_image_jobs()
+    assert jobs.get().status == ImageJob.FAILED
+    post.refresh_from_db()
+    assert not post.image_variants_ready
+
+
+def test_image_job_limits_follow_settings(
+        mixer, user, published_category, settings):
+    settings.IMAGE_JOB_MAX_ATTEMPTS = 1
+    settings.IMAGE_JOB_RETRY_DELAY = 0
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ImageFile(BytesIO(b"not an image"), name="broken.jpg"),
+    )
+    process_image_jobs()
+    assert ImageJob.objects.get(post=post).status == ImageJob.FAILED, (
+        "Убедитесь, что количество попыток и пауза между ними "
+        "задаются настройками IMAGE_JOB_MAX_ATTEMPTS "
+        "и IMAGE_JOB_RETRY_DELAY."
+    )
+
+
+def test_feed_uses_image_variants(post_with_published_location, client):
+    process_image_jobs()
+    post_with_published_location.refresh_from_db()
+    content = client.get("/").content.decode("utf-8")
+    assert post_with_published_location.image_urls["feed_webp"] in content, (
+        "Убедитесь, что в ленте показываются уменьшенные копии фото "
+        "с атрибутом `srcset`."
+    )
+
+
+def test_image_job_purges_only_post_feeds(
+        post_with_published_location, client):
+    from blog.cache import ALL_SCOPE, PAGE_VERSION_KEY
+
+    client.get("/")
+    all_version = cache.get(PAGE_VERSION_KEY.format(ALL_SCOPE))
+    process_image_jobs()
+    post_with_published_location.refresh_from_db()
+    content = client.get("/").content.decode("utf-8")
+    assert post_with_published_location.image_urls["feed_webp"] in content, (
+        "Убедитесь, что после обработки фото сбрасываются ленты поста."
+    )
+    assert cache.get(PAGE_VERSION_KEY.format(ALL_SCOPE)) == all_version, (
+        "Убедитесь, что обработка фото не сбрасывает кэш всех лент."
+    )
+
+
+def test_build_thumbnails_command(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(image_variants_ready=False)
+    call_command("build_thumbnails", "--workers=2", stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).image_variants_ready
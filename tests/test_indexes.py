@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+
+from blog.models import Post
+from blog.utils import filtered_select_posts
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS_FOR_BENCHMARK = 200
+POST_INDEXES = (
+    "post_published_pub_date_idx",
+    "post_category_pub_date_idx",
+    "post_author_pub_date_idx",
+)
+
+
+def explain(queryset) -> str:
+    """План запроса для SQLite и PostgreSQL.
+    На PostgreSQL последовательное сканирование отключается, чтобы на
+    маленьком тестовом наборе данных планировщик показал выбор индекса."""
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        if connection.vendor == "postgresql":
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def assert_uses_post_index(plan: str, page: str):
+    if connection.vendor not in ("sqlite", "postgresql"):
+        pytest.skip(f"Нет проверки плана для {connection.vendor}")
+    assert any(index in plan for index in POST_INDEXES), (
+        f"Убедитесь, что запрос ленты {page} использует индексы модели "
+        f"`Post`. План запроса:\n{plan}"
+    )
+    full_scan = (
+        "SCAN blog_post\n" in plan + "\n"
+        if connection.vendor == "sqlite"
+        else "Seq Scan on blog_post" in plan
+    )
+    assert not full_scan, (
+        f"Запрос ленты {page} выполняет полный просмотр таблицы постов:\n"
+        f"{plan}"
+    )
+
+
+@pytest.fixture
+def benchmark_posts(mixer, user, another_user, published_category):
+    return mixer.cycle(N_POSTS_FOR_BENCHMARK).blend(
+        "blog.Post",
+        author=mixer.sequence(user, another_user),
+        category=published_category,
+    )
+
+
+def test_index_feed_uses_index(benchmark_posts):
+    assert_uses_post_index(
+        explain(filtered_select_posts(Post.objects)), "главной страницы"
+    )
+
+
+def test_category_feed_uses_index(benchmark_posts, published_category):
+    assert_uses_post_index(
+        explain(filtered_select_posts(published_category.posts.all())),
+        "страницы категории",
+    )
+
+
+def test_profile_feed_uses_index(benchmark_posts, user):
+    assert_uses_post_index(
+        explain(Post.objects.filter(author=user).order_by("-pub_date")),
+        "страницы пользователя",
+    )
+
+
+def test_image_references_use_index(benchmark_posts):
+    for post in benchmark_posts:
+        Post.objects.filter(pk=post.pk).update(
+            image=f"posts_images/{post.pk}.jpg"
+        )
+    plan = explain(
+        Post.objects.filter(image="posts_images/1.jpg").order_by()
+    )
+    if connection.vendor == "sqlite":
+        assert "SCAN blog_post\n" not in plan + "\n", (
+            "Убедитесь, что поиск публикаций по файлу фото использует "
+            f"индекс, а не полный просмотр таблицы:\n{plan}"
+        )
@@ -0,0 +1,109 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.media import get_image_storage
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def image_file(color):
+    buffer = BytesIO()
+    Image.new("RGB", (30, 30), color=color).save(buffer, format="PNG")
+    return ImageFile(buffer, name="photo.png")
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(image):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            image=image,
+        )
+    return blend
+
+
+def test_identical_uploads_share_one_file(blend_post):
+    first = blend_post(image_file((1, 2, 3)))
+    second = blend_post(image_file((1, 2, 3)))
+    other = blend_post(image_file((3, 2, 1)))
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые фото сохраняются одним файлом."
+    )
+    assert first.image.name != other.image.name
+
+
+def test_shared_file_is_deleted_with_last_reference(blend_post):
+    first = blend_post(image_file((4, 5, 6)))
+    second = blend_post(image_file((4, 5, 6)))
+    storage = get_image_storage()
+    name = first.image.name
+    first.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что фото не удаляется, пока на него ссылаются "
+        "другие публикации."
+    )
+    second.author.delete()
+    assert not storage.exists(name), (
+        "Убедитесь, что фото без ссылок удаляется, в том числе при "
+        "каскадном удалении публикаций пользователя."
+    )
+
+
+def test_release_rechecks_references_before_delete(
+        blend_post, monkeypatch):
+    from blog import media
+
+    first = blend_post(image_file((7, 8, 9)))
+    name = first.image.name
+    storage = get_image_storage()
+    delete_image_variants = media.delete_image_variants
+
+    def upload_during_release(*args):
+        delete_image_variants(*args)
+        blend_post(image_file((7, 8, 9)))
+
+    monkeypatch.setattr(
+        media, "delete_image_variants", upload_during_release
+    )
+    first.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что фото не удаляется, если одновременная загрузка "
+        "того же фото сослалась на него, пока оно освобождалось."
+    )
+
+
+def test_dedupe_media_command(blend_post):
+    storage = get_image_storage()
+    content = image_file((7, 8, 9)).read()
+    legacy_names = [
+        super(type(storage), storage).save(
+            f"posts_images/legacy_{i}.png", ContentFile(content)
+        )
+        for i in range(2)
+    ]
+    posts = [blend_post(None) for _ in legacy_names]
+    for post, name in zip(posts, legacy_names):
+        Post.objects.filter(pk=post.pk).update(image=name)
+    call_command("dedupe_media", stdout=StringIO())
+    names = set(
+        Post.objects.filter(pk__in=[post.pk for post in posts])
+        .values_list("image", flat=True)
+    )
+    assert len(names) == 1, (
+        "Убедитесь, что команда `dedupe_media` объединяет одинаковые фото."
+    )
+    assert storage.exists(names.pop())
+    for name in legacy_names:
+        assert not storage.exists(name)
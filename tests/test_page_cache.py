@@ -0,0 +1,147 @@
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+FILE_BASED_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": None,
+    }
+}
+
+
+@pytest.fixture
+def feed_urls(post_with_published_location):
+    post = post_with_published_location
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+
+
+def get_content(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode("utf-8")
+
+
+def test_anonymous_feeds_are_cached(
+        feed_urls, client, django_assert_max_num_queries):
+    for url in feed_urls:
+        first = get_content(client, url)
+        # На странице профиля остаётся только поиск пользователя.
+        with django_assert_max_num_queries(1):
+            assert get_content(client, url) == first, (
+                "Убедитесь, что страницы лент для гостей кэшируются."
+            )
+
+
+def test_authenticated_feeds_are_not_cached(feed_urls, user_client):
+    user_client.get("/")
+    assert user_client.get("/").context is not None, (
+        "Убедитесь, что страницы лент для авторизованных пользователей "
+        "не берутся из кэша."
+    )
+
+
+@pytest.mark.parametrize("change", ["post", "comment", "category", "location"])
+def test_cached_feeds_are_purged(
+        change, feed_urls, post_with_published_location, mixer, client):
+    post = post_with_published_location
+    for url in feed_urls:
+        get_content(client, url)
+    if change == "post":
+        post.title = marker = "Изменённый заголовок"
+        post.save()
+    elif change == "comment":
+        mixer.blend("blog.Comment", post=post)
+        marker = "Комментарии (1)"
+    elif change == "category":
+        post.category.title = marker = "Изменённая категория"
+        post.category.save()
+    else:
+        post.location.name = marker = "Изменённое место"
+        post.location.save()
+    for url in feed_urls:
+        assert marker in get_content(client, url), (
+            f"Убедитесь, что кэш страницы {url} сбрасывается при изменении "
+            "публикации, комментария, категории или местоположения."
+        )
+
+
+def test_file_based_cache_backend(feed_urls, client, tmp_path):
+    caches = {"default": dict(FILE_BASED_CACHE["default"],
+                              LOCATION=str(tmp_path))}
+    with override_settings(CACHES=caches):
+        first = get_content(client, "/")
+        assert any(tmp_path.iterdir()), (
+            "Убедитесь, что страницы лент кэшируются и файловым кэшем."
+        )
+        assert get_content(client, "/") == first
+
+
+def test_post_card_fragments_are_shared(
+        feed_urls, post_with_published_location, user_client):
+    post = post_with_published_location
+    get_content(user_client, feed_urls[0])
+    type(post).objects.filter(pk=post.pk).update(title="Без сигналов")
+    for url in feed_urls[1:]:
+        assert post.title in get_content(user_client, url), (
+            "Убедитесь, что карточка поста кэшируется и переиспользуется "
+            "на страницах категории и профиля."
+        )
+    post.refresh_from_db()
+    post.save()
+    for url in feed_urls:
+        assert "Без сигналов" in get_content(user_client, url), (
+            "Убедитесь, что кэш карточки сбрасывается при изменении поста."
+        )
+
+
+def test_evicted_versions_do_not_revive_stale_pages(
+        feed_urls, post_with_published_location, client):
+    from blog.cache import CARD_VERSION_KEY, INDEX_SCOPE, PAGE_VERSION_KEY
+
+    post = post_with_published_location
+    stale = get_content(client, "/")
+    post.title = "Новый заголовок"
+    post.save()
+    assert post.title in get_content(client, "/")
+    # Кэш вытеснил счётчики версий, а записи старых версий остались
+    cache.delete_many([
+        PAGE_VERSION_KEY.format(INDEX_SCOPE),
+        CARD_VERSION_KEY.format(post.pk),
+    ])
+    post.save()
+    content = get_content(client, "/")
+    assert content != stale and post.title in content, (
+        "Убедитесь, что вытесненный из кэша счётчик версий не возвращается "
+        "к прежнему значению и не отдаёт устаревшие страницы и карточки."
+    )
+
+
+def test_username_change_purges_author_feeds(
+        feed_urls, post_with_published_location, mixer, client):
+    from blog.cache import ALL_SCOPE, PAGE_VERSION_KEY
+
+    author = post_with_published_location.author
+    for url in feed_urls:
+        get_content(client, url)
+    all_version = cache.get(PAGE_VERSION_KEY.format(ALL_SCOPE))
+    mixer.blend("auth.User")
+    author.set_password("new-password")
+    author.save()
+    assert cache.get(PAGE_VERSION_KEY.format(ALL_SCOPE)) == all_version, (
+        "Убедитесь, что регистрация и смена пароля не сбрасывают кэш "
+        "всех лент."
+    )
+    author.username = "renamed_author"
+    author.save()
+    for url in feed_urls[:2]:
+        assert "@renamed_author" in get_content(client, url), (
+            f"Убедитесь, что кэш страницы {url} сбрасывается при смене "
+            "имени автора."
+        )
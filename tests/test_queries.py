@@ -0,0 +1,118 @@
+import pytest
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+# Бюджет SQL-запросов страниц лент для анонимного пользователя.
+# Он не должен зависеть от количества публикаций и комментариев.
+INDEX_QUERIES = 2  # количество постов + страница постов
+CATEGORY_QUERIES = 3  # категория + количество постов + страница постов
+PROFILE_QUERIES = 3  # пользователь + количество постов + страница постов
+DETAIL_QUERIES = 2  # пост со связями + комментарии с авторами
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_locations):
+    posts = mixer.cycle(N_PER_PAGE * 2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=mixer.sequence(*published_locations),
+    )
+    mixer.cycle(N_PER_PAGE * 3).blend(
+        "blog.Comment", post=mixer.sequence(*posts)
+    )
+    return posts
+
+
+def assert_page_queries(client, url, expected, django_assert_num_queries):
+    with django_assert_num_queries(expected):
+        response = client.get(url)
+    assert response.status_code == 200
+
+
+def test_index_queries(feed_posts, client, django_assert_num_queries):
+    assert_page_queries(client, "/", INDEX_QUERIES, django_assert_num_queries)
+
+
+def test_category_queries(
+        feed_posts, published_category, client, django_assert_num_queries):
+    assert_page_queries(
+        client, f"/category/{published_category.slug}/",
+        CATEGORY_QUERIES, django_assert_num_queries
+    )
+
+
+def test_profile_queries(feed_posts, user, client, django_assert_num_queries):
+    assert_page_queries(
+        client, f"/profile/{user.username}/",
+        PROFILE_QUERIES, django_assert_num_queries
+    )
+
+
+def test_detail_queries(feed_posts, client, django_assert_num_queries):
+    post = max(feed_posts, key=lambda post: post.comments.count())
+    assert_page_queries(
+        client, f"/posts/{post.id}/", DETAIL_QUERIES,
+        django_assert_num_queries
+    )
+
+
+def test_detail_queries_for_author(
+        feed_posts, user_client, django_assert_num_queries):
+    # Сессия и пользователь запроса добавляют два запроса.
+    assert_page_queries(
+        user_client, f"/posts/{feed_posts[0].id}/", DETAIL_QUERIES + 2,
+        django_assert_num_queries
+    )
+
+
+def test_feed_count_is_cached(
+        feed_posts, mixer, user, published_category, user_client,
+        django_assert_num_queries):
+    client = user_client
+    client.get("/")
+    # Сессия и пользователь запроса; количество постов берётся из кэша.
+    with django_assert_num_queries(INDEX_QUERIES + 2 - 1):
+        client.get("/")
+    new_post = mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+    response = client.get("/")
+    assert response.context["paginator"].count == len(feed_posts) + 1, (
+        "Убедитесь, что кэш количества постов сбрасывается при "
+        "публикации нового поста."
+    )
+    new_post.delete()
+    response = client.get("/")
+    assert response.context["paginator"].count == len(feed_posts), (
+        "Убедитесь, что кэш количества постов сбрасывается при "
+        "удалении поста."
+    )
+
+
+def test_edit_post_loads_post_once(
+        feed_posts, user_client, django_assert_num_queries):
+    # Сессия, пользователь запроса, сам пост
+    # и варианты выбора местоположения и категории в форме.
+    with django_assert_num_queries(5):
+        response = user_client.get(f"/posts/{feed_posts[0].id}/edit/")
+    assert response.status_code == 200
+
+
+def test_category_is_cached_until_changed(
+        feed_posts, published_category, user_client,
+        django_assert_num_queries):
+    client = user_client
+    url = f"/category/{published_category.slug}/"
+    client.get(url)
+    # Сессия и пользователь запроса;
+    # категория и количество постов берутся из кэша.
+    with django_assert_num_queries(CATEGORY_QUERIES + 2 - 2):
+        client.get(url)
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что снятая с публикации категория сразу перестаёт "
+        "отображаться, несмотря на кэширование."
+    )
@@ -0,0 +1,111 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def search_posts(mixer, user, published_category):
+    return {
+        "title": mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title="Путешествие на Байкал", text="Зимой было холодно.",
+        ),
+        "text": mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title="Заметки", text="Летом снова поедем на Байкал.",
+        ),
+        "other": mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title="Рецепт", text="Пирог с яблоками.",
+        ),
+    }
+
+
+def search(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return list(response.context["page_obj"])
+
+
+def test_search_ranks_title_matches_first(search_posts, client):
+    assert search(client, "байкал") == [
+        search_posts["title"], search_posts["text"]
+    ], (
+        "Убедитесь, что поиск находит публикации по заголовку и тексту "
+        "и ставит совпадения в заголовке выше."
+    )
+
+
+def test_search_index_follows_posts(search_posts, client):
+    post = search_posts["other"]
+    post.text = "Пирог с брусникой."
+    post.save()
+    assert search(client, "брусникой") == [post], (
+        "Убедитесь, что индекс поиска обновляется при изменении публикации."
+    )
+    post.delete()
+    assert search(client, "брусникой") == []
+
+
+@pytest.mark.parametrize("query", ["", '"', "AND OR NOT", "байкал*("])
+def test_search_handles_any_input(search_posts, client, query):
+    search(client, query)
+
+
+def test_search_hides_unpublished(search_posts, client):
+    post = search_posts["title"]
+    post.is_published = False
+    post.save()
+    assert search(client, "байкал") == [search_posts["text"]]
+
+
+def test_rebuild_search_index(search_posts, client):
+    type(search_posts["other"]).objects.filter(
+        pk=search_posts["other"].pk
+    ).update(text="Пирог с вишней.")
+    assert search(client, "вишней") == []
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert search(client, "вишней") == [search_posts["other"]], (
+        "Убедитесь, что команда rebuild_search_index строит индекс заново."
+    )
+
+
+def test_admin_search_uses_index(search_posts, admin_client):
+    response = admin_client.get("/admin/blog/post/", {"q": "байкал"})
+    assert set(response.context["cl"].result_list) == {
+        search_posts["title"], search_posts["text"]
+    }, "Убедитесь, что поиск в админ-зоне ищет по заголовку и тексту."
+
+
+def test_search_without_index(search_posts, client, admin_client,
+                              monkeypatch):
+    monkeypatch.setattr("blog.search.uses_search_table", lambda: False)
+    assert set(search(client, "Байкал")) == {
+        search_posts["title"], search_posts["text"]
+    }, (
+        "Убедитесь, что без полнотекстового индекса поиск ищет подстроку "
+        "в заголовке и тексте."
+    )
+    response = admin_client.get("/admin/blog/post/", {"q": "Байкал"})
+    assert response.status_code == 200
+
+
+def test_search_joins_index_once(search_posts, client):
+    with CaptureQueriesContext(connection) as queries:
+        search(client, "байкал")
+    matches = [
+        query["sql"] for query in queries.captured_queries
+        if "MATCH" in query["sql"]
+    ]
+    assert matches and all(
+        sql.count("MATCH") == 1 and "JOIN \"blog_post_fts\"" in sql
+        for sql in matches
+    ), (
+        "Убедитесь, что индекс присоединяется к публикациям один раз "
+        "и релевантность не считается подзапросом для каждой строки."
+    )
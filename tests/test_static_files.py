@@ -0,0 +1,128 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import override_settings
+
+from core.static import IMMUTABLE_CACHE_CONTROL, StaticFilesMiddleware
+
+ASSET = "admin/css/base.css"
+
+
+@pytest.fixture(scope="module")
+def collected_static(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("static")
+    with override_settings(
+        STATIC_ROOT=tmp_path,
+        STATICFILES_DIRS=[],
+        STATICFILES_STORAGE=(
+            "core.storage.CompressedManifestStaticFilesStorage"
+        ),
+    ):
+        call_command("collectstatic", "--noinput", stdout=StringIO())
+        yield tmp_path
+
+
+def request(application, path, accept_encoding=""):
+    response = {}
+
+    def start_response(status, headers):
+        response["status"] = status
+        response["headers"] = dict(headers)
+
+    body = b"".join(application({
+        "PATH_INFO": path,
+        "REQUEST_METHOD": "GET",
+        "HTTP_ACCEPT_ENCODING": accept_encoding,
+    }, start_response))
+    return response["status"], response["headers"], body
+
+
+def not_found_app(environ, start_response):
+    start_response("404 Not Found", [])
+    return [b""]
+
+
+def test_collectstatic_creates_hashed_and_compressed_files(collected_static):
+    hashed = staticfiles_storage.stored_name(ASSET)
+    assert hashed != ASSET, (
+        "Убедитесь, что в production имена статики содержат хэш."
+    )
+    assert (collected_static / (hashed + ".gz")).exists(), (
+        "Убедитесь, что при collectstatic создаются сжатые копии статики."
+    )
+
+
+def test_hashed_static_is_served_immutable(collected_static):
+    application = StaticFilesMiddleware(not_found_app)
+    hashed = staticfiles_storage.stored_name(ASSET)
+    status, headers, body = request(
+        application, f"/static/{hashed}", accept_encoding="gzip, deflate"
+    )
+    assert status == "200 OK"
+    assert headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == (
+        collected_static / hashed
+    ).read_bytes()
+
+    status, headers, _ = request(application, f"/static/{ASSET}")
+    assert "immutable" not in headers["Cache-Control"]
+    assert "Content-Encoding" not in headers
+
+
+@pytest.mark.parametrize("accept_encoding", [
+    "gzip;q=0",
+    "gzip; q=0.0, deflate",
+    "x-gzip-like, deflate",
+    "*;q=0",
+])
+def test_refused_encoding_is_not_served(collected_static, accept_encoding):
+    application = StaticFilesMiddleware(not_found_app)
+    hashed = staticfiles_storage.stored_name(ASSET)
+    status, headers, body = request(
+        application, f"/static/{hashed}", accept_encoding=accept_encoding
+    )
+    assert status == "200 OK"
+    assert "Content-Encoding" not in headers, (
+        "Убедитесь, что сжатая копия не отдаётся, если клиент не принимает "
+        "её кодировку (q=0 или другой токен в Accept-Encoding)."
+    )
+    assert body == (collected_static / hashed).read_bytes()
+
+
+@pytest.mark.parametrize("accept_encoding", [
+    "GZIP;q=0.5", "gzip;q=0.8, *;q=0.2", "br;q=0, *",
+])
+def test_accepted_encoding_is_served(collected_static, accept_encoding):
+    application = StaticFilesMiddleware(not_found_app)
+    hashed = staticfiles_storage.stored_name(ASSET)
+    _, headers, _ = request(
+        application, f"/static/{hashed}", accept_encoding=accept_encoding
+    )
+    assert headers.get("Content-Encoding") == "gzip", (
+        "Убедитесь, что Accept-Encoding разбирается по токенам "
+        "с учётом регистра, «*» и весов q."
+    )
+
+
+def test_brotli_is_preferred(collected_static):
+    brotli = pytest.importorskip("brotli")
+    application = StaticFilesMiddleware(not_found_app)
+    hashed = staticfiles_storage.stored_name(ASSET)
+    _, headers, body = request(
+        application, f"/static/{hashed}", accept_encoding="gzip, br"
+    )
+    assert headers.get("Content-Encoding") == "br", (
+        "Убедитесь, что при collectstatic создаются копии .br "
+        "и отдаются клиентам, которые принимают br."
+    )
+    assert brotli.decompress(body) == (collected_static / hashed).read_bytes()
+
+
+def test_static_handler_stays_inside_root(collected_static):
+    application = StaticFilesMiddleware(not_found_app)
+    status, _, _ = request(application, "/static/../../etc/passwd")
+    assert status == "404 Not Found"
@@ -0,0 +1,23 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+
+
+def test_cached_template_loader_in_production():
+    if settings.DEBUG:
+        return
+    loaders = settings.TEMPLATES[0]["OPTIONS"]["loaders"]
+    assert loaders[0][0] == "django.template.loaders.cached.Loader", (
+        "Убедитесь, что при DEBUG = False шаблоны загружаются "
+        "кэширующим загрузчиком."
+    )
+
+
+def test_warm_templates_command():
+    stdout = StringIO()
+    call_command("warm_templates", stdout=stdout)
+    assert "Загружено шаблонов" in stdout.getvalue(), (
+        "Убедитесь, что команда `warm_templates` загружает все шаблоны "
+        "проекта без ошибок."
+    )
@@ -0,0 +1,93 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blog_content(mixer, user, another_user, published_category,
+                 published_location):
+    posts = mixer.cycle(5).blend(
+        "blog.Post",
+        author=mixer.sequence(user, another_user),
+        category=published_category,
+        location=mixer.sequence(published_location, None),
+        title=mixer.sequence("Байкал {0}"),
+    )
+    mixer.cycle(7).blend(
+        "blog.Comment", post=mixer.sequence(*posts), author=another_user
+    )
+    return posts
+
+
+def snapshot():
+    return {
+        model.__name__: sorted(
+            model.objects.values_list(*fields)
+        )
+        for model, fields in (
+            (User, ("username", "password")),
+            (Category, ("slug", "title", "created_at")),
+            (Location, ("id", "name", "created_at")),
+            (Post, ("id", "title", "author__username", "category__slug",
+                    "location_id", "pub_date", "created_at",
+                    "comment_count")),
+            (Comment, ("id", "post_id", "author__username", "created_at")),
+        )
+    }
+
+
+def test_export_import_round_trip(blog_content, tmp_path, client):
+    path = tmp_path / "blog.jsonl"
+    before = snapshot()
+    call_command("export_blog", str(path), stdout=io.StringIO())
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert all(json.loads(line)["model"] for line in lines), (
+        "Убедитесь, что export_blog выгружает по одной JSON-записи в строке."
+    )
+    for model in (Comment, Post, Location, Category, User):
+        model.objects.all().delete()
+    call_command(
+        "import_blog", str(path), chunk_size=2, stdout=io.StringIO()
+    )
+    assert snapshot() == before, (
+        "Убедитесь, что import_blog восстанавливает выгрузку export_blog "
+        "со связями, датами создания и количеством комментариев."
+    )
+    response = client.get("/search/", {"q": "байкал"})
+    assert len(response.context["page_obj"]) == len(blog_content), (
+        "Убедитесь, что импортированные публикации попадают в индекс поиска."
+    )
+
+
+def test_import_skips_existing(blog_content, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", str(path), stdout=io.StringIO())
+    before = snapshot()
+    output = io.StringIO()
+    call_command("import_blog", str(path), stdout=output)
+    assert snapshot() == before
+    assert "создано 0" in output.getvalue(), (
+        "Убедитесь, что повторный импорт не создаёт дубликатов."
+    )
+
+
+def test_import_rejects_broken_file(tmp_path):
+    path = tmp_path / "blog.jsonl"
+    path.write_text('{"model": "blog.unknown"}\n', encoding="utf-8")
+    with pytest.raises(CommandError, match="unknown"):
+        call_command("import_blog", str(path), stdout=io.StringIO())
+
+
+def test_import_rejects_foreign_post_with_same_id(blog_content, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", str(path), stdout=io.StringIO())
+    post = blog_content[0]
+    Post.objects.filter(pk=post.pk).update(title="Другая публикация")
+    with pytest.raises(CommandError, match="title"):
+        call_command("import_blog", str(path), stdout=io.StringIO())
@@ -0,0 +1,60 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(size, image_format="PNG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(buffer, image_format)
+    return SimpleUploadedFile(
+        f"upload.{image_format.lower()}", buffer.getvalue(),
+        content_type=f"image/{image_format.lower()}",
+    )
+
+
+def create_post(user_client, published_category, image):
+    return user_client.post("/posts/create/", {
+        "title": "Пост с фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": published_category.id,
+        "image": image,
+    })
+
+
+def test_small_image_is_accepted(user_client, published_category):
+    response = create_post(user_client, published_category, make_image((20, 20)))
+    assert response.status_code == 302
+    assert Post.objects.exclude(image="").exists()
+
+
+@override_settings(POST_IMAGE_MAX_BYTES=1024)
+def test_oversized_upload_is_rejected_while_streaming(
+        user_client, published_category):
+    image = make_image((300, 300), "BMP")
+    assert image.size > 1024
+    response = create_post(user_client, published_category, image)
+    assert response.status_code == 200, (
+        "Убедитесь, что фото больше `POST_IMAGE_MAX_BYTES` не принимается."
+    )
+    assert "image" in response.context["form"].errors
+    assert not Post.objects.exists()
+
+
+@override_settings(POST_IMAGE_MAX_PIXELS=100)
+def test_image_with_too_many_pixels_is_rejected(
+        user_client, published_category):
+    response = create_post(user_client, published_category, make_image((20, 20)))
+    assert response.status_code == 200, (
+        "Убедитесь, что фото больше `POST_IMAGE_MAX_PIXELS` пикселей "
+        "не принимается."
+    )
+    assert "image" in response.context["form"].errors